@@ -1,22 +1,118 @@
 import numpy as np
 import astropy.units as u
 from astropy.time import Time, TimeDelta
-from sunpy.coordinates import sun
 import os
 import glob
+import copy
+import functools
+import importlib
 import h5py
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-import moviepy.editor as mpy
-from moviepy.video.io.bindings import mplfig_to_npimage
-from skimage import measure
-import scipy.ndimage as ndi
-from numba import jit
+import multiprocessing
+import numba
+from numba import jit, types
 
-mpl.rc("axes", labelsize=16)
-mpl.rc("ytick", labelsize=16)
-mpl.rc("xtick", labelsize=16)
-mpl.rc("legend", fontsize=16)
+
+class _LazyModule_:
+    """
+    A placeholder for a module that is imported when one of its attributes is first used. The plotting, animation,
+    CME tracking and ephemeris libraries are loaded this way, so that importing HUXt for headless model runs only
+    imports numpy, numba, h5py and astropy.
+    """
+
+    def __init__(self, name, on_import=None):
+        """
+        :param name: Full name of the module, e.g. "matplotlib.pyplot".
+        :param on_import: Optional function called with the module once it is imported.
+        """
+        self._name_ = name
+        self._on_import_ = on_import
+        self._module_ = None
+
+    def _load_(self):
+        """
+        Import the module, if it isn't already.
+        :return: The module.
+        """
+        if self._module_ is None:
+            self._module_ = importlib.import_module(self._name_)
+            if self._on_import_ is not None:
+                self._on_import_(self._module_)
+
+        return self._module_
+
+    def __getattr__(self, attr):
+        return getattr(self._load_(), attr)
+
+
+def _set_plot_style_(module):
+    """
+    Set the matplotlib style of HUXt figures. This is applied when matplotlib is first used by HUXt.
+    :param module: The matplotlib module that was imported.
+    """
+    import matplotlib
+    matplotlib.rc("axes", labelsize=16)
+    matplotlib.rc("ytick", labelsize=16)
+    matplotlib.rc("xtick", labelsize=16)
+    matplotlib.rc("legend", fontsize=16)
+    return
+
+
+plt = _LazyModule_("matplotlib.pyplot", on_import=_set_plot_style_)
+mpl = _LazyModule_("matplotlib", on_import=_set_plot_style_)
+imageio = _LazyModule_("imageio")
+measure = _LazyModule_("skimage.measure")
+ndi = _LazyModule_("scipy.ndimage")
+sun = _LazyModule_("sunpy.coordinates.sun")
+
+
+class _QuantityView_:
+    """
+    A descriptor for array attributes that are stored internally as plain numpy arrays in a fixed unit, and returned
+    as astropy Quantity views of that array on access. This avoids copies and unit bookkeeping in the model internals,
+    while the attribute behaves as a Quantity for users. Quantities assigned to the attribute are converted to the
+    fixed unit, plain arrays are assumed to already be in it, and LazyQuantity instances are stored and returned as is.
+    """
+
+    def __init__(self, unit, allocate=None):
+        """
+        :param unit: The unit the attribute is stored in.
+        :param allocate: Optional name of a method of the owner class, that returns the initial array of an attribute
+                         that is accessed before it is set. This defers allocating large arrays until they are used.
+        """
+        self.unit = u.Unit(unit)
+        self.allocate = allocate
+
+    def __set_name__(self, owner, name):
+        self.name = "_{}_".format(name)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            if self.allocate is None:
+                raise AttributeError(self.name[1:-1])
+
+            value = getattr(instance, self.allocate)()
+            instance.__dict__[self.name] = value
+
+        if isinstance(value, LazyQuantity):
+            return value
+
+        return u.Quantity(value, self.unit, copy=False)
+
+    def __set__(self, instance, value):
+        if isinstance(value, LazyQuantity):
+            instance.__dict__[self.name] = value
+        elif isinstance(value, u.Quantity):
+            instance.__dict__[self.name] = value.to_value(self.unit)
+        else:
+            value = np.asarray(value)
+            if value.dtype.kind != 'f':
+                value = value.astype(float)
+            instance.__dict__[self.name] = value
 
 
 class Observer:
@@ -40,56 +136,22 @@ class Observer:
         :param body: String indicating which body to look up the positions of .
         :param times: A list/array of Astropy Times to interpolate the coordinate of the selected body.
         """
-        bodies = ["EARTH", "VENUS", "MERCURY", "STA", "STB"]
-        if body.upper() in bodies:
-            self.body = body.upper()
-        else:
-            print("Warning, body {} not recognised.".format(body))
-            print("Only {} are valid.".format(bodies))
-            print("Defaulting to Earth")
-            self.body = "EARTH"
+        self.body = _check_body_(body)
 
-        # Get path to ephemeris file and open
+        # Get the ephemeris of this body, which is read from file once per process.
         dirs = _setup_dirs_()
-        ephem = h5py.File(dirs['ephemeris'], 'r')
-
-        # Now get observers coordinates
-        all_time = Time(ephem[self.body]['HEEQ']['time'], format='jd')
-        # Pad out the window to account for single values being passed. 
-        dt = TimeDelta(2 * 60 * 60, format='sec')
-        id_epoch = (all_time >= (times.min() - dt)) & (all_time <= (times.max() + dt))
-        epoch_time = all_time[id_epoch]
+        ephem = _read_ephemeris_(dirs['ephemeris'])[self.body]
         self.time = times
 
-        r = ephem[self.body]['HEEQ']['radius'][id_epoch]
-        self.r = np.interp(times.jd, epoch_time.jd, r)
-        self.r = (self.r * u.km).to(u.solRad)
-
-        lon = np.deg2rad(ephem[self.body]['HEEQ']['longitude'][id_epoch])
-        lon = np.unwrap(lon)
-        self.lon = np.interp(times.jd, epoch_time.jd, lon)
-        self.lon = _zerototwopi_(self.lon)
-        self.lon = self.lon * u.rad
-
-        lat = np.deg2rad(ephem[self.body]['HEEQ']['latitude'][id_epoch])
-        self.lat = np.interp(times.jd, epoch_time.jd, lat)
-        self.lat = self.lat * u.rad
-
-        r = ephem[self.body]['CARR']['radius'][id_epoch]
-        self.r_c = np.interp(times.jd, epoch_time.jd, r)
-        self.r_c = (self.r_c * u.km).to(u.solRad)
+        heeq, carr = _interp_ephemeris_(ephem, times.jd)
 
-        lon = np.deg2rad(ephem[self.body]['CARR']['longitude'][id_epoch])
-        lon = np.unwrap(lon)
-        self.lon_c = np.interp(times.jd, epoch_time.jd, lon)
-        self.lon_c = _zerototwopi_(self.lon_c)
-        self.lon_c = self.lon_c * u.rad
+        self.r = (heeq[0] * u.km).to(u.solRad)
+        self.lon = _zerototwopi_(heeq[1]) * u.rad
+        self.lat = heeq[2] * u.rad
 
-        lat = np.deg2rad(ephem[self.body]['CARR']['latitude'][id_epoch])
-        self.lat_c = np.interp(times.jd, epoch_time.jd, lat)
-        self.lat_c = self.lat_c * u.rad
-
-        ephem.close()
+        self.r_c = (carr[0] * u.km).to(u.solRad)
+        self.lon_c = _zerototwopi_(carr[1]) * u.rad
+        self.lat_c = carr[2] * u.rad
         return
 
 
@@ -106,14 +168,21 @@ class ConeCME:
         thickness: Thickness of the CME cone, in km.
         coords: Dictionary containing the radial and longitudinal (for HUXT2D) coordinates of the of Cone CME for each
                 model time step.
+        envelope: Dictionary containing the front and back radius of the Cone CME at each model time step and longitude.
     """
 
-    # Some decorators for checking the units of input arguments
-    @u.quantity_input(t_launch=u.s)
-    @u.quantity_input(longitude=u.deg)
-    @u.quantity_input(v=(u.km / u.s))
-    @u.quantity_input(width=u.deg)
-    @u.quantity_input(thickness=u.solRad)
+    # CME parameters are stored as plain arrays in the units used by the solver.
+    t_launch = _QuantityView_(u.s)
+    longitude = _QuantityView_(u.rad)
+    latitude = _QuantityView_(u.rad)
+    v = _QuantityView_(u.km / u.s)
+    width = _QuantityView_(u.rad)
+    initial_height = _QuantityView_(u.km)
+    radius = _QuantityView_(u.km)
+    thickness = _QuantityView_(u.km)
+
+    # Decorator for checking the units of input arguments
+    @u.quantity_input(t_launch=u.s, longitude=u.deg, v=(u.km / u.s), width=u.deg, thickness=u.solRad)
     def __init__(self, t_launch=0.0 * u.s, longitude=0.0 * u.deg, latitude=0.0 * u.deg, v=1000.0 * (u.km / u.s),
                  width=30.0 * u.deg,
                  thickness=5.0 * u.solRad):
@@ -136,6 +205,7 @@ class ConeCME:
         self.radius = self.initial_height * np.tan(self.width / 2.0)  # Initial radius of CME
         self.thickness = thickness  # Extra CME thickness
         self.coords = {}
+        self.envelope = {}
         return
 
     def parameter_array(self):
@@ -143,9 +213,9 @@ class ConeCME:
         Returns a numpy array of CME parameters. This is used in the numba optimised solvers that don't play nicely
         with classes.
         """
-        cme_parameters = [self.t_launch.to('s').value, self.longitude.to('rad').value, self.latitude.to('rad').value,
-                          self.width.to('rad').value, self.v.value, self.initial_height.to('km').value,
-                          self.radius.to('km').value, self.thickness.to('km').value]
+        cme_parameters = [float(self._t_launch_), float(self._longitude_), float(self._latitude_),
+                          float(self._width_), float(self._v_), float(self._initial_height_), float(self._radius_),
+                          float(self._thickness_)]
         return cme_parameters
 
     def _track_1d_(self, model):
@@ -155,8 +225,7 @@ class ConeCME:
         :return: updates the ConeCME.coords dictionary of CME coordinates.
         """
         # Owens definition of CME in HUXt:
-        diff = model.v_grid_cme - model.v_grid_amb
-        cme_bool = diff >= 20 * model.kms
+        cme_bool = (model.v_grid_cme.value - model.v_grid_amb.value) >= 20
 
         # Workflow: Loop over each CME, track CME through each time step,
         # find contours of boundary, save to dict.
@@ -165,9 +234,9 @@ class ConeCME:
                        range(model.nt_out)}
 
         first_frame = True
-        for j, t in enumerate(model.time_out):
+        for j, t in enumerate(model.time_out.value):
 
-            if t < self.t_launch:
+            if t < self._t_launch_:
                 continue
 
             cme_bool_t = cme_bool[j, :]
@@ -223,8 +292,7 @@ class ConeCME:
         """
 
         # Owens definition of CME in HUXt:
-        diff = model.v_grid_cme - model.v_grid_amb
-        cme_bool = diff >= 20 * model.kms
+        cme_bool = (model.v_grid_cme.value - model.v_grid_amb.value) >= 20
 
         # Find index of middle longitude for centering arrays on the CMEs
         id_mid_lon = np.argmin(np.abs(model.lon - np.median(model.lon)))
@@ -238,9 +306,9 @@ class ConeCME:
                        range(model.nt_out)}
 
         first_frame = True
-        for j, t in enumerate(model.time_out):
+        for j, t in enumerate(model.time_out.value):
 
-            if t < self.t_launch:
+            if t < self._t_launch_:
                 continue
 
             cme_bool_t = cme_bool[j, :, :]
@@ -306,6 +374,76 @@ class ConeCME:
                     target = cme_id.copy()
         return
 
+    def _track_envelope_(self, model):
+        """
+        Tracks the polar envelope of each ConeCME through the HUXt solution in model. For each output time and model
+        longitude, this finds the inner (back) and outer (front) radius of the flow of this CME, using array
+        reductions over all frames at once rather than contouring each frame. The flow of each CME is told apart
+        from that of other CMEs by tracing its front from when it crosses the inner boundary, so this doesn't depend
+        on the crossing landing on an output time.
+        :param model: An HUXt instance, with solutions for the CME and ambient fields, and this CME in model.cmes.
+        :return: updates the ConeCME.envelope dictionary of CME front and back radii.
+        """
+        nr = model.nr
+        lon = np.atleast_1d(model.lon.to(u.rad).value)
+        lat = np.full(lon.size, model.lat.to(u.rad).value[0])
+        cme_params = np.array([cme.parameter_array() for cme in model.cmes]).reshape((len(model.cmes), 8))
+        owner = _cme_flow_owner_(model.v_grid_cme.value, model.v_grid_amb.value, model.r.to('km').value,
+                                 model.time_out.to(u.s).value, lon, lat, cme_params)
+        cme_id = owner[model.cmes.index(self)]
+        found = np.any(cme_id, axis=1)
+        r_back_pix = np.argmax(cme_id, axis=1).astype(float)
+        r_front_pix = (nr - 1 - np.argmax(cme_id[:, ::-1, :], axis=1)).astype(float)
+        r_back_pix[~found] = np.NaN
+        r_front_pix[~found] = np.NaN
+
+        self.envelope = {'r_front_pix': r_front_pix * u.pix, 'r_back_pix': r_back_pix * u.pix,
+                         'r_front': np.interp(r_front_pix, np.arange(0, nr), model.r.value) * model.r.unit,
+                         'r_back': np.interp(r_back_pix, np.arange(0, nr), model.r.value) * model.r.unit}
+        return
+
+    def envelope_to_coords(self, model):
+        """
+        Convert the polar envelope of this ConeCME into the closed boundary format of ConeCME.coords, as used for
+        plotting. The boundary runs along the CME front in a clockwise sense, and returns along the CME back.
+        :param model: The HUXt instance used to compute ConeCME.envelope.
+        :return: coords: Dictionary of CME boundary coordinates for each model output time.
+        """
+        coords = {j: {'lon_pix': np.array([]) * u.pix, 'r_pix': np.array([]) * u.pix,
+                      'lon': np.array([]) * model.lon.unit, 'r': np.array([]) * model.r.unit} for j in
+                  range(model.nt_out)}
+
+        if len(self.envelope) == 0:
+            print("Warning, no envelope computed for this ConeCME. Returning empty coords")
+            return coords
+
+        r_front_pix = self.envelope['r_front_pix'].value
+        r_back_pix = self.envelope['r_back_pix'].value
+        lon = np.atleast_1d(model.lon.value)
+
+        # Order longitudes relative to the CME nose, to avoid breaking the boundary at the 0/2pi crossing.
+        lon_cent = lon - self.longitude.to(model.lon.unit).value
+        id_sort = np.argsort(np.arctan2(np.sin(lon_cent), np.cos(lon_cent)))
+
+        for j in range(model.nt_out):
+            id_lon = id_sort[np.isfinite(r_front_pix[j, id_sort])]
+            if id_lon.size == 0:
+                continue
+
+            if lon.size == 1:
+                # Single radial, so follow _track_1d_ and return all radial points inside the CME.
+                r_pix = np.arange(r_back_pix[j, 0], r_front_pix[j, 0] + 1)
+                lon_pix = np.zeros(r_pix.shape)
+            else:
+                r_pix = np.hstack((r_front_pix[j, id_lon], r_back_pix[j, id_lon[::-1]], r_front_pix[j, id_lon[0]]))
+                lon_pix = np.hstack((id_lon, id_lon[::-1], id_lon[0])).astype(float)
+
+            coords[j]['lon_pix'] = lon_pix * u.pix
+            coords[j]['r_pix'] = r_pix * u.pix
+            coords[j]['r'] = np.interp(r_pix, np.arange(0, model.nr), model.r.value) * model.r.unit
+            coords[j]['lon'] = lon[lon_pix.astype(int)] * model.lon.unit
+        return coords
+
 
 class HUXt:
     """
@@ -323,15 +461,21 @@ class HUXt:
         cr_lon_init: The initial Carrington longitude of Earth at the models initial timestep.
         daysec: seconds in a day.
         dlon: Longitudinal grid spacing (in radians)
-        dr: Radial grid spacing (in km).
-        dt: Model time step (in seconds), set by the CFL condition with v_max and dr.
+        dr: Radial grid spacing (in km). For a stretched grid, this is the first step.
+        dr_stretch: Ratio of each radial grid step to the previous, 1 for a uniform grid.
+        dt: Model time step (in seconds), set by the CFL condition with v_max and dr. In adaptive_dt mode, solve
+            resets this from the fastest boundary or ConeCME speed.
         dt_out: Output model time step (in seconds).
         dt_scale: Integer scaling number to set the model output time step relative to the models CFL time step.
         dtdr: Ratio of the model time step and radial grid step (in seconds/km).
+        dtype: Numpy data type that the output solar wind speed fields are stored with.
         kms: astropy.unit instance of km/s.       
+        lat: Array of model latitudes (in radians).
         lon: Array of model longtidues (in radians).
         r_grid: Array of longitudinal coordinates meshed with the radial coordinates (in radians).
+        nlat: Number of model latitudes.
         nlon: Number of longitudinal grid points.
+        nlon_full: Number of longitudes in the full longitude grid, which sets the longitudinal resolution.
         nr: Number of radial grid points.
         Nt: Total number of model time steps, including spin up.
         nt_out: Number of output model time steps.
@@ -339,32 +483,51 @@ class HUXt:
         r: Radial grid (in km).
         r_grid: Array of radial coordinates meshed with the longitudinal coordinates (in km).
         rrel: Radial grid relative to first grid point (in km).
+        scheme: The numerical scheme used to solve the model, either 'upwind' or 'semi-lagrangian'.
         simtime: Simulation time (in seconds).
         synodic_period: Solar Synodic rotation period from Earth (in seconds).
         time: Array of model time steps, including spin up (in seconds).
         time_init: The UTC time corresonding to the initial Carrington rotation number and longitude. Else, NaN. 
         time_out: Array of output model time steps (in seconds).
         twopi: two pi radians
-        v_boundary: Inner boundary solar wind speed profile (in km/s).
+        v_boundary: Inner boundary solar wind speed profile (in km/s). Of shape (nlat, nlon_full) if nlat > 1.
         v_grid_amb: Array of ambient model solution excluding ConeCMEs for each time, radius, and longitude (in km/s).
+                    With more than one latitude, this has a fourth dimension of latitude.
         v_grid_cme: Array of model solution inlcuding ConeCMEs for each time, radius, and longitude (in km/s).
+                    With more than one latitude, this has a fourth dimension of latitude.
         v_max: Maximum model speed (in km/s), used with the CFL condition to set the model time step. 
     """
 
-    # Decorators to check units on input arguments
-    @u.quantity_input(v_boundary=(u.km / u.s))
-    @u.quantity_input(simtime=u.day)
-    @u.quantity_input(cr_lon_init=u.deg)
+    # Arrays are stored as plain numpy arrays in fixed units, and returned as Quantity views on access.
+    r = _QuantityView_(u.solRad)
+    rrel = _QuantityView_(u.solRad)
+    lon = _QuantityView_(u.rad)
+    lat = _QuantityView_(u.rad)
+    r_grid = _QuantityView_(u.solRad)
+    lon_grid = _QuantityView_(u.rad)
+    time = _QuantityView_(u.s)
+    time_out = _QuantityView_(u.s)
+    v_boundary = _QuantityView_(u.km / u.s)
+    v_grid_cme = _QuantityView_(u.km / u.s, allocate='_empty_output_')
+    v_grid_amb = _QuantityView_(u.km / u.s, allocate='_empty_output_')
+
+    # Decorator to check units on input arguments
+    @u.quantity_input(v_boundary=(u.km / u.s), simtime=u.day, cr_lon_init=u.deg, dr=u.solRad, lat=u.rad)
     def __init__(self, v_boundary=np.NaN * (u.km / u.s), cr_num=np.NaN, cr_lon_init=360.0 * u.deg,
                  r_min=30 * u.solRad, r_max=240 * u.solRad,
                  lon_out=np.NaN * u.rad, lon_start=np.NaN * u.rad, lon_stop=np.NaN * u.rad,
-                 simtime=5.0 * u.day, dt_scale=1.0, map_inwards=False):
+                 simtime=5.0 * u.day, dt_scale=1.0, map_inwards=False, dtype=np.float64, adaptive_dt=False,
+                 scheme='upwind', nlon_full=128, dr=np.NaN * u.solRad, dr_stretch=1.0, lat=0.0 * u.rad):
         """
         Initialise the HUXt instance.
 
-        :param v_boundary: Inner solar wind speed boundary condition. Must be an array of size 128 with units of km/s.
+        :param v_boundary: Inner solar wind speed boundary condition. Must be an array with units of km/s, of
+                           longitudes evenly spaced from 0 to 2pi. This is resampled to nlon_full longitudes if needed.
+                           For more than one latitude, this can be of shape (nlat, n_longitude), else the same
+                           boundary is used at every latitude.
         :param cr_num: Integer Carrington rotation number. Used to lookup the longitudinal solar wind speed profile
-                       at the solar equator from HelioMAS. This is then used as the inner boundary condition.
+                       at the solar equator from HelioMAS. This is then used as the inner boundary condition, at every
+                       latitude.
         :param cr_lon_init: Carrington longitude of Earth at model initialisation, in degrees.
         :param lon_out: A specific single longitude to compute HUXt solution along.
         :param lon_start: The first longitude (in a clockwise sense) of the longitude range to solve HUXt over.
@@ -375,6 +538,25 @@ class HUXt:
         :param dt_scale: Integer scaling number to set the model output time step relative to the models CFL time.
         :param map_inwards: Boolean, determines whether map_v_boundary_inwards is used to estimate boundary speed at
                             distances inwards of 30Rs
+        :param dtype: Data type to store the output solar wind speed fields with, either np.float64 or np.float32.
+                      The model is always integrated in float64, but float32 storage halves the memory of the output.
+        :param adaptive_dt: Boolean, if True solve sets the model time step from the CFL condition with the fastest
+                            boundary or ConeCME speed, rather than v_max, and interpolates the output onto time_out.
+                            Runs without fast CMEs then take a few times fewer steps. Only used by the upwind scheme.
+        :param scheme: String, either 'upwind' for the upwind scheme, or 'semi-lagrangian' for a semi-Lagrangian
+                       scheme that isn't limited by the CFL condition, and so steps straight to each output time. With
+                       a large dt_scale, this is much faster than the upwind scheme, but less accurate.
+        :param nlon_full: Number of longitudes in the full longitude grid, which sets the longitudinal resolution.
+                          Boundary conditions of a different size, such as the 128 longitude Carrington maps, are
+                          resampled to this grid.
+        :param dr: The radial grid step. For a stretched grid, this is the shortest first step, which sets the time
+                   step. The steps are scaled up slightly so the grid ends at r_max. Defaults to the dr of
+                   huxt_constants.
+        :param dr_stretch: Ratio of each radial grid step to the previous. 1 gives a uniform grid, and larger values
+                           a grid that is fine near the inner boundary and coarse further out, with fewer grid points.
+        :param lat: The latitude, or array of latitudes, to solve HUXt at. With more than one latitude, the output
+                    speed fields have a fourth dimension of latitude, and the cost of solving scales with the number of
+                    latitudes.
         """
 
         # some constants and units
@@ -396,16 +578,28 @@ class HUXt:
         self._ephemeris_file = dirs['ephemeris']
 
         # Setup radial coordinates - in solar radius
-        self.r, self.dr, self.rrel, self.nr = radial_grid(r_min=r_min, r_max=r_max)
+        self.r, self.dr, self.rrel, self.nr = radial_grid(r_min=r_min, r_max=r_max, dr=dr, dr_stretch=dr_stretch)
+        self.dr_stretch = max(dr_stretch, 1.0) * u.dimensionless_unscaled
         self.buffertime = ((5.0 * u.day) / (210 * u.solRad)) * self.rrel[-1]
 
         # Setup longitude coordinates - in radians.
-        self.lon, self.dlon, self.nlon = longitude_grid(lon_out=lon_out, lon_start=lon_start, lon_stop=lon_stop)
+        self.nlon_full = np.int32(nlon_full)
+        self.lon, self.dlon, self.nlon = longitude_grid(lon_out=lon_out, lon_start=lon_start, lon_stop=lon_stop,
+                                                        nlon=self.nlon_full)
+
+        # Setup latitude coordinates - in radians.
+        lat = np.atleast_1d(lat.to(u.rad))
+        if np.any(np.abs(lat) > (np.pi / 2) * u.rad) or np.any(np.isnan(lat)):
+            print("Error, lat must be between -90 and 90 degrees. Defaulting to the equator")
+            lat = np.zeros(1) * u.rad
+
+        self.lat = lat
+        self.nlat = self.lat.size
 
         # Setup time coords - in seconds
         self.simtime = simtime.to('s')  # number of days to simulate (in seconds)
         self.dt_scale = dt_scale * u.dimensionless_unscaled
-        time_grid_dict = time_grid(self.simtime, self.dt_scale)
+        time_grid_dict = time_grid(self.simtime, self.dt_scale, dr=self.dr)
         self.dtdr = time_grid_dict['dtdr']
         self.Nt = time_grid_dict['Nt']
         self.dt = time_grid_dict['dt']
@@ -415,6 +609,16 @@ class HUXt:
         self.time_out = time_grid_dict['time_out']
         del time_grid_dict
 
+        if scheme not in ['upwind', 'semi-lagrangian']:
+            print("Error, scheme must be either 'upwind', or 'semi-lagrangian'. Defaulting to 'upwind'")
+            scheme = 'upwind'
+
+        self.scheme = scheme
+        if self.scheme == 'semi-lagrangian':
+            # Not limited by the CFL condition, so step straight to each output time. Outputs more frequent than the
+            # CFL time step are interpolated between steps of the CFL time step.
+            self._set_time_step_(max(np.int32(self.dt_scale.value), 1) * self.dt)
+
         # Check cr_lon_init, make sure in 0-2pi range.
         self.cr_lon_init = cr_lon_init.to('rad')
         if (self.cr_lon_init < 0.0 * u.rad) | (self.cr_lon_init > self.twopi * u.rad):
@@ -424,10 +628,9 @@ class HUXt:
         # Determine the boundary conditions from input v_boundary and cr_num, and cr_lon_init
         if np.all(np.isnan(v_boundary)) & np.isnan(cr_num):
             print("Warning: No boundary conditions supplied. Defaulting to 400 km/s boundary")
-            self.v_boundary = 400 * np.ones(128) * self.kms
+            self.v_boundary = 400 * np.ones(self.nlon_full) * self.kms
             self.cr_num = 9999 * u.dimensionless_unscaled
         elif not np.all(np.isnan(v_boundary)):
-            assert v_boundary.size == 128
             self.v_boundary = v_boundary
             if np.isnan(cr_num):
                 # Set dummy number for cr_num
@@ -435,70 +638,216 @@ class HUXt:
             else:
                 self.cr_num = cr_num * u.dimensionless_unscaled
         elif not np.isnan(cr_num):
-            # Find and load in the boundary condition file
+            # Find and load in the boundary condition, from the boundary archive if it exists.
             self.cr_num = cr_num * u.dimensionless_unscaled
-            cr_tag = "CR{:03d}.hdf5".format(np.int32(self.cr_num.value))
-            boundary_file = os.path.join(self._boundary_dir_, cr_tag)
-            if os.path.exists(boundary_file):
-                data = h5py.File(boundary_file, 'r')
-                self.v_boundary = data['v_boundary'] * u.Unit(data['v_boundary'].attrs['unit'])
-                data.close()
-            else:
-                print("Warning: {} not found. Defaulting to 400 km/s boundary".format(boundary_file))
-                self.v_boundary = 400 * np.ones(128) * self.kms
+            v_boundary = load_boundary(np.int32(self.cr_num.value), boundary_dir=self._boundary_dir_)
+            if v_boundary is None:
+                print("Warning: CR{:03d} not found in {}. Defaulting to 400 km/s boundary".format(
+                    np.int32(self.cr_num.value), self._boundary_dir_))
+                v_boundary = 400 * np.ones(self.nlon_full) * self.kms
+
+            self.v_boundary = v_boundary
+
+        # The boundary condition has one row of longitudes for each latitude, or is 1D for a single latitude. A single
+        # boundary, such as the equatorial Carrington maps, is used at every latitude.
+        v_rows = np.atleast_2d(self._v_boundary_)
+        if v_rows.shape[0] != self.nlat:
+            if v_rows.shape[0] != 1:
+                print("Error, v_boundary must have one row for each latitude. Defaulting to the first row at all "
+                      "latitudes")
+            v_rows = np.repeat(v_rows[0:1, :], self.nlat, axis=0)
+
+        # Resample the boundary condition to the longitude grid, map it inwards if needed, and rotate it as required by
+        # cr_lon_init. Cached, as sweeps over r_min and cr_lon_init repeat this for the same boundary conditions.
+        v_rows = np.ascontiguousarray(v_rows, dtype=np.float64)
+        v_init, v_rows = _preprocess_boundary_(v_rows.tobytes(), v_rows.shape[1], self.nlon_full,
+                                               self.r[0].to_value(u.solRad), self.cr_lon_init.to_value(u.rad),
+                                               bool(map_inwards))
 
         # Keep a protected version that isn't processed for use in saving/loading model runs
-        self._v_boundary_init_ = self.v_boundary.copy()
+        self._v_boundary_init_ = u.Quantity(v_init[0, :] if self.nlat == 1 else v_init, self.kms, copy=False)
+        self.v_boundary = (v_rows[0, :] if self.nlat == 1 else v_rows) * self.kms
+
         if map_inwards:
             self._map_inwards_ = 1.0 * u.dimensionless_unscaled
         else:
             self._map_inwards_ = 0.0 * u.dimensionless_unscaled
 
-        if map_inwards:
-            # Assumes inner boundary was specified at 30 Rs, which is true for default Carrington maps.
-            r_outer = 30 * u.solRad
-            r_inner = self.r.min()
-            self.v_boundary = map_v_boundary_inwards(self.v_boundary, r_outer, r_inner)
-
-        # Rotate the boundary condition as required by cr_lon_init.
-        if self.cr_lon_init != 360 * u.rad:
-            lon_boundary, dlon, nlon = longitude_grid()
-            lon_shifted = _zerototwopi_((lon_boundary - self.cr_lon_init).value)
-            id_sort = np.argsort(lon_shifted)
-            lon_shifted = lon_shifted[id_sort]
-            v_b_shifted = self.v_boundary[id_sort]
-            self.v_boundary = np.interp(lon_boundary.value, lon_shifted, v_b_shifted, period=self.twopi)
+        if adaptive_dt:
+            self._adaptive_dt_ = 1.0 * u.dimensionless_unscaled
+        else:
+            self._adaptive_dt_ = 0.0 * u.dimensionless_unscaled
 
         # Compute model UTC initalisation time, if using Carrington map boundary.
         if self.cr_num.value != 9999:
             cr_frac = self.cr_num.value + ((self.twopi - self.cr_lon_init.value) / self.twopi)
-            self.time_init = sun.carrington_rotation_time(cr_frac)
+            self.time_init = _carrington_rotation_time_(float(cr_frac)).copy()
         else:
             self.time_init = np.NaN
 
-        # Preallocate space for the output for the solar wind fields for the cme and ambient solution.
-        self.v_grid_cme = np.zeros((self.nt_out, self.nr, self.nlon)) * self.kms
-        self.v_grid_amb = np.zeros((self.nt_out, self.nr, self.nlon)) * self.kms
+        # The output solar wind fields for the cme and ambient solution aren't allocated until the model is solved,
+        # or the fields are first accessed.
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in [np.float32, np.float64]:
+            print("Error, dtype must be either np.float32, or np.float64. Defaulting to np.float64")
+            self.dtype = np.dtype(np.float64)
 
         # Mesh the spatial coordinates.
-        self.lon_grid, self.r_grid = np.meshgrid(self.lon, self.r)
+        self.lon_grid, self.r_grid = np.meshgrid(self.lon.value, self.r.value)
 
         # Empty dictionary for storing the coordinates of CME boundaries.
         self.cmes = []
 
+        # Handle of the HDF5 file backing the output of lazily loaded model runs, see load_HUXt_run.
+        self._file_ = None
+
         # Numpy array of model parameters for parsing to external functions that use numba
+        self._update_model_params_()
+        return
+
+    def _empty_output_(self):
+        """
+        Allocate an array for one of the output solar wind speed fields, filled with zeros.
+        :return: Array of shape (nt_out, nr, nlon), or (nt_out, nr, nlon, nlat) with more than one latitude, with the
+                 model storage dtype.
+        """
+        return np.zeros(self._output_shape_(), dtype=self.dtype)
+
+    def _output_shape_(self):
+        """
+        The shape of the output solar wind speed fields, which only have a latitude dimension if nlat > 1.
+        :return: Tuple of the output shape.
+        """
+        if self.nlat == 1:
+            return self.nt_out, self.nr, self.nlon
+        else:
+            return self.nt_out, self.nr, self.nlon, self.nlat
+
+    def _update_model_params_(self):
+        """
+        Update the numpy array of model parameters used by the numba optimised solvers, that don't play nicely with
+        classes.
+        """
+        scheme_id = {'upwind': 0, 'semi-lagrangian': 1}[self.scheme]
         self.model_params = np.array([self.dtdr.value, self.alpha.value, self.r_accel.value,
                                       self.dt_scale.value, self.nt_out, self.nr, self.nlon,
-                                      self.r[0].to('km').value])
+                                      self.r[0].to('km').value, scheme_id, self.dt.to_value(u.s)])
+        return
+
+    def _set_time_step_(self, dt):
+        """
+        Set the model time step, and the model time coordinates that depend on it.
+        :param dt: The model time step.
+        """
+        self.dt = dt.to('s')
+        self.dtdr = self.dt / self.dr.to('km')
+        self.Nt = np.int32(np.floor(self.simtime.to_value(u.s) / self.dt.value))
+        self.time = np.arange(0, self.Nt) * self.dt
+        self._update_model_params_()
+        return
+
+    def _set_adaptive_dt_(self):
+        """
+        Set the model time step from the CFL condition with the fastest speed of the boundary condition, ConeCMEs and
+        the initial condition, rather than v_max. The fastest speed is increased by the maximum residual acceleration
+        over the domain.
+        """
+        constants = huxt_constants()
+        v_fastest = max([constants['v_init'].value, self._v_boundary_.max()] + [cme._v_ for cme in self.cmes])
+        v_fastest = v_fastest * self.kms
+        v_fastest = v_fastest * (1.0 + self.alpha)
+        self._set_time_step_(constants['cfl'] * self.dr.to('km') / v_fastest)
+        return
+
+    def _set_output_times_(self, t_start=None, t_stop=None, dt_out=None):
+        """
+        Set the output times of the model. By default, these are every dt_scale model time steps over the whole
+        simulation. Otherwise, they span the window from t_start to t_stop with a cadence of dt_out. Both are saved
+        from the model iterations given by _output_index_, so a window of the default cadence gives the same frames.
+        :param t_start: Time of the first output, or None for the start of the simulation.
+        :param t_stop: Latest time of the last output, or None for the end of the simulation.
+        :param dt_out: Output cadence, or None for the default output time step.
+        """
+        time_grid_dict = time_grid(self.simtime, self.dt_scale, dr=self.dr)
+        if (t_start is None) and (t_stop is None) and (dt_out is None):
+            self.nt_out = time_grid_dict['nt_out']
+            self.dt_out = time_grid_dict['dt_out']
+            self.time_out = time_grid_dict['time_out']
+            self._update_model_params_()
+            return
+
+        # Output at time t is the solution int(dt_scale) steps of the v_max time step later, as for the default output.
+        t_lag = np.int64(self.dt_scale.value) * time_grid_dict['dt']
+        t_max = self.simtime.to(u.s) - t_lag
+
+        if dt_out is None:
+            dt_out = time_grid_dict['dt_out']
+        elif dt_out <= 0 * u.s:
+            print("Error, dt_out must be positive. Defaulting to the model output time step")
+            dt_out = time_grid_dict['dt_out']
+
+        if t_start is None:
+            t_start = 0 * u.s
+        elif (t_start < 0 * u.s) | (t_start > t_max):
+            print("Error, t_start outside span of model times. Defaulting to closest time")
+            t_start = np.clip(t_start.to(u.s), 0 * u.s, t_max)
+
+        if t_stop is None:
+            t_stop = t_max
+        elif (t_stop < t_start) | (t_stop > t_max):
+            print("Error, t_stop outside span of output window. Defaulting to closest time")
+            t_stop = np.clip(t_stop.to(u.s), t_start.to(u.s), t_max)
+
+        # Allow for rounding error in the number of outputs that fit in the window.
+        nt_out = np.int32(np.floor((t_stop - t_start).to_value(u.s) / dt_out.to_value(u.s) + 1e-6)) + 1
+        self.nt_out = nt_out
+        self.dt_out = dt_out.to(u.s)
+        self.time_out = t_start.to(u.s) + np.arange(nt_out) * self.dt_out
+        self._update_model_params_()
         return
 
-    def solve(self, cme_list, save=False, tag=''):
+    def _output_index_(self, buffersteps):
+        """
+        Compute the model iterations saved to each output time, counting from the start of the spin up. Output at each
+        time in time_out is the solution int(dt_scale) steps of the v_max time step later, so for the default output
+        times, output k is the solution int(dt_scale) * (k + 1) steps after time zero if dt_scale is an integer. Output
+        times that fall between model iterations, such as with adaptive_dt, a non-integer dt_scale, or an output
+        window, are interpolated by solve_radial.
+        :param buffersteps: Number of model iterations in the spin up period.
+        :return: Array of the (possibly fractional) model iteration of each output time.
+        """
+        n_scale = np.int64(self.dt_scale.value)
+        dt_ref = time_grid(self.simtime, self.dt_scale, dr=self.dr)['dt']
+        t_out = self.time_out.to_value(u.s) + n_scale * dt_ref.to_value(u.s)
+        out_index = buffersteps + t_out / self.dt.to_value(u.s) - 1.0
+        # Snap iterations within rounding error of an integer, so they aren't interpolated.
+        out_index_int = np.rint(out_index)
+        out_index = np.where(np.abs(out_index - out_index_int) < 1e-6, out_index_int, out_index)
+        out_index = np.maximum(out_index, 0.0)
+        return out_index
+
+    @u.quantity_input(t_start=u.s, t_stop=u.s, dt_out=u.s)
+    def solve(self, cme_list, save=False, tag='', track='contour', t_start=None, t_stop=None, dt_out=None,
+              reuse_spin_up=True):
         """
         Solve HUXt for the provided boundary conditions and cme list
 
         :param cme_list: A list of ConeCME instances to use in solving HUXt
         :param save: Boolean, if True saves model output to HDF5 file
         :param tag: String, appended to the filename of saved soltuion.
+        :param track: String, either 'contour' or 'envelope', specifying how CME boundaries are tracked. 'envelope'
+                      computes the CME front and back radius at each longitude, and converts this to ConeCME.coords.
+        :param t_start: Time of the first output, with an astropy.unit of time. Defaults to the simulation start.
+        :param t_stop: Latest time of the last output, with an astropy.unit of time. Defaults to the simulation end.
+        :param dt_out: Output cadence, with an astropy.unit of time. Defaults to the dt_scale output time step. Outputs
+                       between model time steps are linearly interpolated. Together with t_start and t_stop, this
+                       resets time_out, so only the outputs that are needed are stored, and the model is only
+                       integrated up to the last output. CMEs that leave the inner boundary before t_start can't be
+                       tracked, so have empty coordinates.
+        :param reuse_spin_up: Boolean, if True the state of the solar wind at the end of the spin up period is cached,
+                              and runs with the same boundary conditions, cr_lon_init, grid and time step, such as the
+                              members of an ensemble of CMEs, start from it rather than integrating the spin up again.
+                              This gives the same solution as integrating the spin up.
 
         Returns:
 
@@ -526,50 +875,104 @@ class HUXt:
             do_cme = 0
             cme_params = np.NaN * np.zeros((1, 8))
 
+        self._set_output_times_(t_start=t_start, t_stop=t_stop, dt_out=dt_out)
+
+        if (self._adaptive_dt_ == 1) and (self.scheme == 'upwind'):
+            self._set_adaptive_dt_()
+
         buffersteps = np.fix(self.buffertime.to(u.s) / self.dt)
         buffertime = buffersteps * self.dt
-        model_time = np.arange(-buffertime.value, (self.simtime.to('s') + self.dt).value, self.dt.value) * self.dt.unit
+        model_time = np.arange(-buffertime.value, (self.simtime.to('s') + self.dt).value, self.dt.value)
         dlondt = self.twopi * self.dt / self.synodic_period
-        all_lons, dlon, nlon = longitude_grid()
+        all_lons, dlon, nlon = longitude_grid(nlon=self.nlon_full)
 
         # How many radians of Carrington rotation in this simulation length
         simlon = self.twopi * self.simtime / self.synodic_period
         # How many radians of Carrington rotation in the spin up period
         bufferlon = self.twopi * buffertime / self.synodic_period
 
-        # Loop through model longitudes and solve each radial profile.
-        for i in range(self.lon.size):
-
-            if self.lon.size == 1:
-                lon_out = self.lon.value
+        # Ratio of the time step to the radial step of each grid cell, which only differ on a stretched grid.
+        if self.dr_stretch == 1:
+            dtdr = np.full(self.nr - 1, self.dtdr.value)
+        else:
+            dtdr = self.dt.to_value(u.s) / np.diff(self.r.to_value(u.km))
+
+        # Model iterations that give each output time. Iterations after the last output aren't needed.
+        out_index = self._output_index_(np.int64(buffersteps.value))
+        if out_index.size > 0:
+            model_time = model_time[:np.int64(np.ceil(out_index[-1])) + 1]
+
+        # Make sure the solvers are compiled, or loaded from the cache.
+        warmup()
+
+        # Allocate the output fields. Every radial is overwritten below, so they needn't be initialised.
+        self.v_grid_amb = np.empty(self._output_shape_(), dtype=self.dtype)
+        self.v_grid_cme = np.empty(self._output_shape_(), dtype=self.dtype)
+
+        # Solve all the radials at each latitude in one batch. The boundary timeseries of each radial is padded to one
+        # more than the number of model iterations, which is as many as the solvers read.
+        lons = np.atleast_1d(self._lon_)
+        v_boundary = np.atleast_2d(self._v_boundary_)
+        simlon = simlon.to_value(u.dimensionless_unscaled)
+        bufferlon = bufferlon.to_value(u.dimensionless_unscaled)
+        dlondt = dlondt.to_value(u.dimensionless_unscaled)
+        vinput = np.empty((self.nlon, model_time.size + 1))
+        n_buffer = np.int64(buffersteps.value)
+        # Parameters of the spin up, without those of the output, so the cached spin up can be reused by any run.
+        spin_up_params = self.model_params.copy()
+        spin_up_params[3:5] = 1
+        spin_up_params = tuple(spin_up_params)
+        for j in range(self.nlat):
+
+            for i, lon_out in enumerate(lons):
+                # Find the Carrigton longitude range spanned by the spin up and simulation period,
+                # centered on simulation longitude
+                lon_start = (lon_out - simlon - dlondt)
+                lon_stop = (lon_out + bufferlon)
+                lonint = np.arange(lon_start, lon_stop, dlondt)
+                # Rectify so that it is between 0 - 2pi
+                loninit = _zerototwopi_(lonint)
+                # Interpolate the inner boundary speed to this higher resolution
+                vinit = np.interp(loninit, all_lons.value, v_boundary[j, :], period=2 * np.pi)
+                # convert from cr longitude to timesolve
+                n_input = min(vinit.size, vinput.shape[1])
+                vinput[i, :n_input] = np.flipud(vinit)[:n_input]
+                vinput[i, n_input:] = vinput[i, n_input - 1]
+
+            # The solvers write straight into the output storage, at this latitude.
+            if self.nlat == 1:
+                v_grid_amb, v_grid_cme = self._v_grid_amb_, self._v_grid_cme_
             else:
-                lon_out = self.lon[i].value
-
-            # Find the Carrigton longitude range spanned by the spin up and simulation period,
-            # centered on simulation longitude
-            lon_start = (lon_out - simlon - dlondt)
-            lon_stop = (lon_out + bufferlon)
-            lonint = np.arange(lon_start, lon_stop, dlondt)
-            # Rectify so that it is between 0 - 2pi
-            loninit = _zerototwopi_(lonint)
-            # Interpolate the inner boundary speed to this higher resolution
-            vinit = np.interp(loninit, all_lons.value, self.v_boundary.value, period=2 * np.pi)
-            # convert from cr longitude to timesolve
-            vinput = np.flipud(vinit)
-
-            v_amb, v_cme = solve_radial(vinput, model_time, self.rrel.value, lon_out, self.model_params, do_cme,
-                                        cme_params)
-
-            self.v_grid_amb[:, :, i] = v_amb * self.kms
-            self.v_grid_cme[:, :, i] = v_cme * self.kms
-
-        # Update CMEs positions by tracking through the solution.
+                v_grid_amb, v_grid_cme = self._v_grid_amb_[..., j], self._v_grid_cme_[..., j]
+
+            if reuse_spin_up and (n_buffer > 0):
+                # The spin up is the same for the ambient and CME solutions, as CMEs are only launched after time
+                # zero. So start from the state at the end of the spin up, which is cached for these inputs.
+                v_init = _spin_up_state_(vinput[:, :n_buffer + 1].tobytes(), model_time[:n_buffer].tobytes(),
+                                         self._rrel_.tobytes(), dtdr.tobytes(), lons.tobytes(), spin_up_params)
+                solve_radials(vinput[:, n_buffer:], model_time[n_buffer:], self._rrel_, dtdr, lons,
+                              self.lat[j].value, self.model_params, do_cme, cme_params, v_init, out_index - n_buffer,
+                              v_grid_amb, v_grid_cme)
+            else:
+                v_init = np.full((self.nlon, self.nr), huxt_constants()['v_init'].value)
+                solve_radials(vinput, model_time, self._rrel_, dtdr, lons, self.lat[j].value, self.model_params,
+                              do_cme, cme_params, v_init, out_index, v_grid_amb, v_grid_cme)
+
+        if track not in ['contour', 'envelope']:
+            print("Error, track must be either 'contour', or 'envelope'. Default to contour")
+            track = 'contour'
+
+        # Update CMEs positions by tracking through the solution, at the model latitude closest to each CME.
         updated_cmes = []
         for cme in self.cmes:
-            if self.lon.size == 1:
-                cme._track_1d_(self)
+            model = self.latitude_slice(cme.latitude)
+            if track == 'envelope':
+                cme._track_envelope_(model)
+                cme.coords = cme.envelope_to_coords(model)
+            elif self.lon.size == 1:
+                cme._track_1d_(model)
             elif self.lon.size > 1:
-                cme._track_2d_(self)
+                cme._track_2d_(model)
 
             updated_cmes.append(cme)
 
@@ -581,13 +984,29 @@ class HUXt:
             self.save(tag=tag)
         return
 
-    def save(self, tag=''):
+    def save(self, tag='', chunks=None, compression=None, compression_opts=None, shuffle=False, dtype=None):
         """
         Save model output to a HDF5 file.
 
         :param tag: identifying string to append to the filename
+        :param chunks: Chunk layout of the output speed fields. Either None for contiguous storage, 'time' for one
+                       chunk per output time (fast for loading snapshots), 'longitude' for one chunk per longitude
+                       (fast for loading timeseries), or a tuple of chunk dimensions passed to h5py.
+        :param compression: Compression filter applied to the speed fields and spatial grids. Either None, 'gzip' or
+                            'lzf'. Compression requires chunked storage, so h5py chooses chunks if none are given.
+        :param compression_opts: Compression setting passed to h5py, e.g. the gzip level in 0-9.
+        :param shuffle: Boolean, if True applies the HDF5 shuffle filter, which usually improves compression.
+        :param dtype: Storage data type of the speed fields and spatial grids, e.g. np.float32. None keeps float64.
         :return out_filepath: Full path to the saved file.
         """
+        if chunks not in [None, 'time', 'longitude'] and not isinstance(chunks, tuple):
+            print("Error, chunks must be None, 'time', 'longitude', or a tuple. Defaulting to None")
+            chunks = None
+
+        if compression not in [None, 'gzip', 'lzf']:
+            print("Error, compression must be None, 'gzip', or 'lzf'. Defaulting to None")
+            compression = None
+
         # Open up hdf5 data file for the HI flow stats
         filename = "HUXt_CR{:03d}_{}.hdf5".format(np.int32(self.cr_num.value), tag)
         out_filepath = os.path.join(self._data_dir_, filename)
@@ -604,98 +1023,170 @@ class HUXt:
         for i, cme in enumerate(self.cmes):
             cme_name = "ConeCME_{:02d}".format(i)
             cmegrp = allcmes.create_group(cme_name)
-            for k, v in cme.__dict__.items():
-                if k != "coords":
-                    dset = cmegrp.create_dataset(k, data=v.value)
-                    dset.attrs['unit'] = v.unit.to_string()
-                    out_file.flush()
-                # Now handle the dictionary of CME boundary coordinates coords > time_out > position
-                if k == "coords":
-                    coordgrp = cmegrp.create_group(k)
-                    for time, position in v.items():
-                        time_label = "t_out_{:03d}".format(time)
-                        timegrp = coordgrp.create_group(time_label)
-                        for pos_label, pos_data in position.items():
-                            dset = timegrp.create_dataset(pos_label, data=pos_data.value)
-                            dset.attrs['unit'] = pos_data.unit.to_string()
-                            out_file.flush()
+            for k in ['t_launch', 'longitude', 'latitude', 'v', 'width', 'initial_height', 'radius', 'thickness']:
+                v = getattr(cme, k)
+                dset = cmegrp.create_dataset(k, data=v.value)
+                dset.attrs['unit'] = v.unit.to_string()
+
+            # Now handle the dictionary of CME boundary coordinates coords > time_out > position
+            coordgrp = cmegrp.create_group("coords")
+            for time, position in cme.coords.items():
+                time_label = "t_out_{:03d}".format(time)
+                timegrp = coordgrp.create_group(time_label)
+                for pos_label, pos_data in position.items():
+                    dset = timegrp.create_dataset(pos_label, data=pos_data.value)
+                    dset.attrs['unit'] = pos_data.unit.to_string()
+
+            # And the envelope of CME front and back radii, if it was tracked.
+            if len(cme.envelope) > 0:
+                envgrp = cmegrp.create_group("envelope")
+                for env_label, env_data in cme.envelope.items():
+                    dset = envgrp.create_dataset(env_label, data=env_data.value)
+                    dset.attrs['unit'] = env_data.unit.to_string()
+                    dset.dims[0].label = 'time'
+                    dset.dims[1].label = 'longitude'
 
         # Loop over the attributes of model instance and save select keys/attributes.
         keys = ['cr_num', 'cr_lon_init', 'simtime', 'dt', 'v_max', 'r_accel', 'alpha',
-                'dt_scale', 'time_out', 'dt_out', 'r', 'dr', 'lon', 'dlon', 'r_grid', 'lon_grid',
-                'v_grid_cme', 'v_grid_amb', 'v_boundary', '_v_boundary_init_', '_map_inwards_']
+                'dt_scale', 'time_out', 'dt_out', 'r', 'dr', 'lon', 'dlon', 'lat', 'r_grid', 'lon_grid',
+                'v_grid_cme', 'v_grid_amb', 'v_boundary', '_v_boundary_init_', '_map_inwards_', '_adaptive_dt_',
+                'dr_stretch']
+
+        # Storage options for the large arrays.
+        grid_keys = ['r_grid', 'lon_grid', 'v_grid_cme', 'v_grid_amb']
+        if chunks == 'time':
+            v_chunks = (1,) + self._output_shape_()[1:]
+        elif chunks == 'longitude':
+            v_chunks = (self.nt_out, self.nr, 1) + (1,) * (self.nlat > 1)
+        else:
+            v_chunks = chunks
 
-        for k, v in self.__dict__.items():
+        for k in keys:
+            v = getattr(self, k)
 
-            if k in keys:
+            if k in grid_keys:
+                data = v.value if dtype is None else v.value.astype(dtype)
+                dset_chunks = v_chunks if k in ['v_grid_cme', 'v_grid_amb'] else None
+                if (dset_chunks is None) and ((compression is not None) or shuffle):
+                    dset_chunks = True
 
+                dset = out_file.create_dataset(k, data=data, chunks=dset_chunks, compression=compression,
+                                               compression_opts=compression_opts, shuffle=shuffle)
+            else:
                 dset = out_file.create_dataset(k, data=v.value)
-                dset.attrs['unit'] = v.unit.to_string()
 
-                # Add on the dimensions of the spatial grids
-                if k in ['r_grid', 'lon_grid']:
-                    dset.dims[0].label = 'radius'
-                    dset.dims[1].label = 'longitude'
+            dset.attrs['unit'] = v.unit.to_string()
 
-                # Add on the dimensions of the output speed fields.
-                if k in ['v_grid_cme', 'v_grid_amb']:
-                    dset.dims[0].label = 'time'
-                    dset.dims[1].label = 'radius'
-                    dset.dims[2].label = 'longitude'
+            # Add on the dimensions of the spatial grids
+            if k in ['r_grid', 'lon_grid']:
+                dset.dims[0].label = 'radius'
+                dset.dims[1].label = 'longitude'
+
+            # Add on the dimensions of the output speed fields.
+            if k in ['v_grid_cme', 'v_grid_amb']:
+                dset.dims[0].label = 'time'
+                dset.dims[1].label = 'radius'
+                dset.dims[2].label = 'longitude'
+                if dset.ndim == 4:
+                    dset.dims[3].label = 'latitude'
+
+        out_file.attrs['scheme'] = self.scheme
 
-                out_file.flush()
+        # Save the UTC initialisation time, so it needn't be recomputed when loading.
+        if isinstance(self.time_init, Time):
+            dset = out_file.create_dataset('time_init', data=[self.time_init.jd1, self.time_init.jd2])
+            dset.attrs['format'] = 'jd'
 
+        out_file.flush()
         out_file.close()
         return out_filepath
 
+    def _plot_model_(self):
+        """
+        Get the model to plot. Models with more than one latitude are plotted at the latitude closest to the equator,
+        and other latitudes can be plotted with latitude_slice.
+        :return model: This model if it has a single latitude, else a HUXt instance of the latitude closest to the
+                       equator.
+        """
+        return self.latitude_slice(0.0 * u.rad)
+
     @u.quantity_input(time=u.day)
-    def plot(self, time, field='cme', save=False, tag=''):
+    def plot(self, time, field='cme', save=False, tag='', render='contour'):
         """
         Make a contour plot on polar axis of the solar wind solution at a specific time.
         :param time: Time to look up closet model time to (with an astropy.unit of time). 
         :param field: String, either 'cme', or 'ambient', specifying which solution to plot.
         :param save: Boolean to determine if the figure is saved.
         :param tag: String to append to the filename if saving the figure.
+        :param render: String, either 'contour' for filled contours, or 'mesh' to draw each model grid cell on a
+                       precomputed polar mesh, which is much faster to render and update.
         :return fig: Figure handle.
         :return ax: Axes handle.
         """
+        model = self._plot_model_()
+        if model is not self:
+            return model.plot(time, field=field, save=save, tag=tag, render=render)
 
         if field not in ['cme', 'ambient']:
             print("Error, field must be either 'cme', or 'ambient'. Default to CME")
             field = 'cme'
 
+        if render not in ['contour', 'mesh']:
+            print("Error, render must be either 'contour', or 'mesh'. Default to contour")
+            render = 'contour'
+
         if (time < self.time_out.min()) | (time > (self.time_out.max())):
             print("Error, input time outside span of model times. Defaulting to closest time")
 
         id_t = np.argmin(np.abs(self.time_out - time))
 
-        # Get plotting data
-        lon_arr, dlon, nlon = longitude_grid()
-        lon, rad = np.meshgrid(lon_arr.value, self.r.value)
+        artists = self._setup_plot_(field, id_t, render=render)
+        fig = artists['fig']
+        ax = artists['ax']
+
+        if save:
+            fig.savefig(self._frame_filepath_(id_t, tag))
+
+        return fig, ax
+
+    def _plot_data_(self, field, id_t):
+        """
+        Get the solar wind speed at one output time on the full longitude grid.
+        :param field: String, either 'cme', or 'ambient', specifying which solution to plot.
+        :param id_t: Index of the output time to plot.
+        :return v: Array of solar wind speeds, of shape (nr, nlon). Longitudes outside of the model are NaN.
+        """
+        lon_arr, dlon, nlon = longitude_grid(nlon=self.nlon_full)
         if field == 'cme':
-            v_sub = self.v_grid_cme.value[id_t, :, :].copy()
+            v_sub = self.v_grid_cme[id_t, :, :].value
         elif field == 'ambient':
-            v_sub = self.v_grid_amb.value[id_t, :, :].copy()
+            v_sub = self.v_grid_amb[id_t, :, :].value
 
         # Insert into full array
         if lon_arr.size != self.lon.size:
             v = np.zeros((self.nr, nlon)) * np.NaN
             if self.lon.size != 1:
-                for i, lo in enumerate(self.lon):
-                    id_match = np.argwhere(lon_arr == lo)[0][0]
-                    v[:, id_match] = v_sub[:, i]
+                id_match = np.rint((self.lon - lon_arr[0]) / dlon).value.astype(np.int64) % nlon
+                v[:, id_match] = v_sub
             else:
                 print('Warning: Trying to contour single radial solution will fail.')
         else:
-            v = v_sub
+            v = v_sub.copy()
 
-        # Pad out to fill the full 2pi of contouring
-        pad = lon[:, 0].reshape((lon.shape[0], 1)) + self.twopi
-        lon = np.concatenate((lon, pad), axis=1)
-        pad = rad[:, 0].reshape((rad.shape[0], 1))
-        rad = np.concatenate((rad, pad), axis=1)
-        pad = v[:, 0].reshape((v.shape[0], 1))
-        v = np.concatenate((v, pad), axis=1)
+        return v
+
+    def _setup_plot_(self, field, id_t, render='contour'):
+        """
+        Build the polar plot of the solar wind solution at one output time. The returned artists can then be updated
+        to other output times with _update_plot_, without rebuilding the figure.
+        :param field: String, either 'cme', or 'ambient', specifying which solution to plot.
+        :param id_t: Index of the output time to plot.
+        :param render: String, either 'contour' for filled contours, or 'mesh' for a polar mesh of grid cells.
+        :return artists: Dictionary of the figure, axes, and the data dependent artists.
+        """
+        # Get plotting coordinates, which are cached for each model grid.
+        lon_arr, dlon, nlon = longitude_grid(nlon=self.nlon_full)
+        mesh = _polar_mesh_(tuple(self.r.value), nlon)
 
         mymap = mpl.cm.viridis
         mymap.set_over('lightgrey')
@@ -703,20 +1194,33 @@ class HUXt:
         dv = 10
         levels = np.arange(200, 800 + dv, dv)
         fig, ax = plt.subplots(figsize=(10, 10), subplot_kw={"projection": "polar"})
-        cnt = ax.contourf(lon, rad, v, levels=levels, cmap=mymap, extend='both')
+        v = self._plot_data_(field, id_t)
+        if render == 'mesh':
+            norm = mpl.colors.BoundaryNorm(levels, mymap.N)
+            cnt = ax.pcolormesh(mesh['lon_edges'], mesh['r_edges'], np.ma.masked_invalid(v), cmap=mymap, norm=norm)
+        else:
+            v = np.concatenate((v, v[:, 0:1]), axis=1)
+            cnt = ax.contourf(mesh['lon'], mesh['rad'], v, levels=levels, cmap=mymap, extend='both')
 
         # Add on CME boundaries
+        cme_lines = []
         if field == 'cme':
             cme_colors = ['r', 'c', 'm', 'y', 'deeppink', 'darkorange']
             for j, cme in enumerate(self.cmes):
                 cid = np.mod(j, len(cme_colors))
-                ax.plot(cme.coords[id_t]['lon'], cme.coords[id_t]['r'], '-', color=cme_colors[cid], linewidth=3)
+                line, = ax.plot(cme.coords[id_t]['lon'], cme.coords[id_t]['r'], '-', color=cme_colors[cid],
+                                linewidth=3)
+                cme_lines.append(line)
 
         # Add on observers if looking at a Carrington rotation.
+        obs_markers = []
+        obs = None
         if self.cr_num.value != 9999:
-            for body, style in zip(['EARTH', 'VENUS', 'MERCURY', 'STA', 'STB'], ['co', 'mo', 'ko', 'rs', 'y^']):
-                obs = self.get_observer(body)
-                ax.plot(obs.lon[id_t], obs.r[id_t], style, markersize=16, label=body)
+            bodies = ['EARTH', 'VENUS', 'MERCURY', 'STA', 'STB']
+            obs = self.get_observers(bodies)
+            for b, (body, style) in enumerate(zip(bodies, ['co', 'mo', 'ko', 'rs', 'y^'])):
+                marker, = ax.plot(obs['lon'][b, 0, id_t], obs['r'][b, 0, id_t], style, markersize=16, label=body)
+                obs_markers.append(marker)
 
             # Add on a legend.
             fig.legend(ncol=5, loc='lower center', frameon=False, handletextpad=0.2, columnspacing=1.0)
@@ -735,58 +1239,222 @@ class HUXt:
         bottom = pos.y0 - dh
         wid = pos.width - 2 * dw
         cbaxes = fig.add_axes([left, bottom, wid, 0.03])
-        cbar1 = fig.colorbar(cnt, cax=cbaxes, orientation='horizontal')
+        if render == 'mesh':
+            cbar1 = fig.colorbar(cnt, cax=cbaxes, orientation='horizontal', extend='both')
+        else:
+            cbar1 = fig.colorbar(cnt, cax=cbaxes, orientation='horizontal')
         cbar1.set_label("Solar Wind Speed (km/s)")
         cbar1.set_ticks(np.arange(200, 900, 100))
 
         # Add label
         label = "Time: {:3.2f} days".format(self.time_out[id_t].to(u.day).value)
-        fig.text(0.675, pos.y0, label, fontsize=16)
+        time_label = fig.text(0.675, pos.y0, label, fontsize=16)
         label = "HUXt2D"
         fig.text(0.175, pos.y0, label, fontsize=16)
 
-        if save:
-            cr_num = np.int32(self.cr_num.value)
-            filename = "HUXt_CR{:03d}_{}_frame_{:03d}.png".format(cr_num, tag, id_t)
-            filepath = os.path.join(self._figure_dir_, filename)
-            fig.savefig(filepath)
+        artists = {'fig': fig, 'ax': ax, 'field': field, 'render': render, 'mesh': mesh, 'levels': levels,
+                   'cmap': mymap, 'field_image': cnt, 'cme_lines': cme_lines, 'obs_markers': obs_markers, 'obs': obs,
+                   'time_label': time_label, 'background': None}
+        return artists
 
-        return fig, ax
+    def _update_plot_(self, artists, id_t):
+        """
+        Update the data dependent artists of a plot made by _setup_plot_ to another output time.
+        :param artists: Dictionary of artists returned by _setup_plot_.
+        :param id_t: Index of the output time to plot.
+        """
+        ax = artists['ax']
+        v = self._plot_data_(artists['field'], id_t)
+
+        if artists['render'] == 'mesh':
+            # The mesh is fixed, so just update the speed of each cell.
+            artists['field_image'].set_array(np.ma.masked_invalid(v).ravel())
+        else:
+            # Contour sets can't be updated in place, so replace the old one. The colorbar only depends on the levels
+            # and colormap, so is unchanged.
+            cnt = artists['field_image']
+            if isinstance(cnt, mpl.artist.Artist):
+                cnt.remove()
+            else:
+                for collection in cnt.collections:
+                    collection.remove()
+
+            mesh = artists['mesh']
+            v = np.concatenate((v, v[:, 0:1]), axis=1)
+            artists['field_image'] = ax.contourf(mesh['lon'], mesh['rad'], v, levels=artists['levels'],
+                                                 cmap=artists['cmap'], extend='both')
+
+        for line, cme in zip(artists['cme_lines'], self.cmes):
+            line.set_data(cme.coords[id_t]['lon'].value, cme.coords[id_t]['r'].value)
 
-    def animate(self, field, tag):
+        obs = artists['obs']
+        for b, marker in enumerate(artists['obs_markers']):
+            marker.set_data([obs['lon'][b, 0, id_t].value], [obs['r'][b, 0, id_t].value])
+
+        label = "Time: {:3.2f} days".format(self.time_out[id_t].to(u.day).value)
+        artists['time_label'].set_text(label)
+        return
+
+    def animate(self, field, tag, workers=1, render='contour'):
         """
-        Animate the model solution, and save as an MP4.
+        Animate the model solution, and save as an MP4. Each rendering process builds the figure once, and only the
+        data dependent artists are updated for each frame. Frames are written in order to a single ffmpeg stream.
         :param field: String, either 'cme', or 'ambient', specifying which solution to animate.
         :param tag: String to append to the filename of the animation.
+        :param workers: Number of processes to render frames with. With more than one worker, the model is copied to
+                        each worker, so models loaded with load_HUXt_run(filepath, lazy=True) must be rendered with a
+                        single worker.
+        :param render: String, either 'contour' for filled contours, or 'mesh' for a polar mesh of grid cells.
         """
+        model = self._plot_model_()
+        if model is not self:
+            return model.animate(field, tag, workers=workers, render=render)
 
         if field not in ['cme', 'ambient']:
             print("Error, field must be either 'cme', or 'ambient'. Default to CME")
             field = 'cme'
 
+        if render not in ['contour', 'mesh']:
+            print("Error, render must be either 'contour', or 'mesh'. Default to contour")
+            render = 'contour'
+
         # Set the duration of the movie
         # Scaled so a 5 day simulation with dt_scale=4 is a 10 second movie.
         duration = self.simtime.value * (10 / 432000)
+        fps = 24
 
-        def make_frame(t):
-            """
-            Produce the frame required by MoviePy.VideoClip.
-            :param t: time through the movie
-            """
-            # Get the time index closest to this fraction of movie duration
-            i = np.int32((self.nt_out - 1) * t / duration)
-            fig, ax = self.plot(self.time_out[i], field)
-            frame = mplfig_to_npimage(fig)
-            plt.close('all')
-            return frame
+        # Get the time index closest to each fraction of movie duration
+        movie_time = np.arange(0, duration, 1.0 / fps)
+        frame_ids = np.int32((self.nt_out - 1) * movie_time / duration)
 
         cr_num = np.int32(self.cr_num.value)
         filename = "HUXt_CR{:03d}_{}_movie.mp4".format(cr_num, tag)
         filepath = os.path.join(self._figure_dir_, filename)
-        animation = mpy.VideoClip(make_frame, duration=duration)
-        animation.write_videofile(filepath, fps=24, codec='libx264')
+        writer = imageio.get_writer(filepath, fps=fps, codec='libx264', macro_block_size=8)
+
+        if workers > 1:
+            with multiprocessing.Pool(workers, initializer=_frame_worker_init_,
+                                      initargs=(self, field, render)) as pool:
+                for frame in pool.imap(_frame_worker_render_, frame_ids, chunksize=4):
+                    writer.append_data(frame)
+        else:
+            artists = self._setup_plot_(field, 0, render=render)
+            for i in frame_ids:
+                self._update_plot_(artists, i)
+                writer.append_data(_render_frame_(artists))
+
+            plt.close(artists['fig'])
+
+        writer.close()
         return
 
+    def export_frames(self, frames, field='cme', tag='', out_dir=None, workers=1, render='contour', radial_lon=None):
+        """
+        Save snapshots of the model solution at many times as PNGs, with the same filenames as plot(save=True). Each
+        rendering process builds the figure and observer positions once, and only updates the data dependent artists
+        for each frame.
+        :param frames: Either times to look up the closest model times to (with an astropy.unit of time), or integer
+                       indices of the output times to save.
+        :param field: String, either 'cme', or 'ambient', specifying which solution to plot.
+        :param tag: String to append to the filenames.
+        :param out_dir: Directory to save the frames in. Defaults to the HUXt figures directory.
+        :param workers: Number of processes to render frames with. With more than one worker, the model is copied to
+                        each worker, so models loaded with load_HUXt_run(filepath, lazy=True) must be rendered with a
+                        single worker.
+        :param render: String, either 'contour' for filled contours, or 'mesh' for a polar mesh of grid cells.
+        :param radial_lon: If not None, a longitude (with an astropy.unit of angle) to also save the radial profile
+                           at for each frame, as with plot_radial(save=True).
+        :return filepaths: List of the paths of the saved files.
+        """
+        model = self._plot_model_()
+        if model is not self:
+            return model.export_frames(frames, field=field, tag=tag, out_dir=out_dir, workers=workers, render=render,
+                                       radial_lon=radial_lon)
+
+        if field not in ['cme', 'ambient']:
+            print("Error, field must be either 'cme', or 'ambient'. Default to CME")
+            field = 'cme'
+
+        if render not in ['contour', 'mesh']:
+            print("Error, render must be either 'contour', or 'mesh'. Default to contour")
+            render = 'contour'
+
+        if out_dir is None:
+            out_dir = self._figure_dir_
+
+        if isinstance(frames, u.Quantity):
+            times = np.atleast_1d(frames.to(u.s))
+            if np.any(times < self.time_out.min()) | np.any(times > self.time_out.max()):
+                print("Error, input time outside span of model times. Defaulting to closest time")
+            frame_ids = np.argmin(np.abs(self.time_out[np.newaxis, :] - times[:, np.newaxis]), axis=1)
+        else:
+            frame_ids = np.atleast_1d(frames).astype(np.int64)
+            if np.any(frame_ids < 0) | np.any(frame_ids >= self.nt_out):
+                print("Error, frame indices outside range of output times. Defaulting to closest index")
+                frame_ids = np.clip(frame_ids, 0, self.nt_out - 1)
+
+        export = {'tag': tag, 'out_dir': out_dir, 'radial_lon': radial_lon}
+        filepaths = []
+        if workers > 1:
+            with multiprocessing.Pool(workers, initializer=_frame_worker_init_,
+                                      initargs=(self, field, render, export)) as pool:
+                for paths in pool.imap(_frame_worker_export_, frame_ids, chunksize=4):
+                    filepaths.extend(paths)
+        else:
+            artists = self._setup_plot_(field, 0, render=render)
+            for i in frame_ids:
+                filepaths.extend(self._export_frame_(artists, i, export))
+
+            plt.close(artists['fig'])
+
+        return filepaths
+
+    def _export_frame_(self, artists, id_t, export):
+        """
+        Save one frame for export_frames.
+        :param artists: Dictionary of artists returned by _setup_plot_.
+        :param id_t: Index of the output time to save.
+        :param export: Dictionary of the tag, out_dir and radial_lon arguments of export_frames.
+        :return filepaths: List of the paths of the saved files.
+        """
+        self._update_plot_(artists, id_t)
+        filepath = self._frame_filepath_(id_t, export['tag'], out_dir=export['out_dir'])
+        imageio.imwrite(filepath, _render_frame_(artists))
+        filepaths = [filepath]
+
+        lon = export['radial_lon']
+        if lon is not None:
+            fig, ax = self.plot_radial(self.time_out[id_t], lon, field=artists['field'])
+            filepath = self._frame_filepath_(id_t, export['tag'], out_dir=export['out_dir'], field=artists['field'],
+                                             lon=lon)
+            fig.savefig(filepath)
+            plt.close(fig)
+            filepaths.append(filepath)
+
+        return filepaths
+
+    def _frame_filepath_(self, id_t, tag, out_dir=None, field=None, lon=None):
+        """
+        Get the path to save a frame of the model solution to.
+        :param id_t: Index of the output time of the frame.
+        :param tag: String to append to the filename.
+        :param out_dir: Directory to save the frame in. Defaults to the HUXt figures directory.
+        :param field: String, the solution plotted in a radial profile frame.
+        :param lon: Longitude of a radial profile frame. If None, the path of a polar plot frame is returned.
+        :return filepath: Path to save the frame to.
+        """
+        if out_dir is None:
+            out_dir = self._figure_dir_
+
+        cr_num = np.int32(self.cr_num.value)
+        if lon is None:
+            filename = "HUXt_CR{:03d}_{}_frame_{:03d}.png".format(cr_num, tag, id_t)
+        else:
+            lon_tag = "{}deg".format(lon.to(u.deg).value)
+            filename = "HUXt_CR{:03d}_{}_{}_radial_profile_lon_{}_frame_{:03d}.png".format(cr_num, tag, field, lon_tag,
+                                                                                           id_t)
+        return os.path.join(out_dir, filename)
+
     def plot_radial(self, time, lon, field='cme', save=False, tag=''):
         """
         Plot the radial solar wind profile at model time closest to specified time.
@@ -798,6 +1466,9 @@ class HUXt:
         :return: fig: Figure handle
         :return: ax: Axes handle
         """
+        model = self._plot_model_()
+        if model is not self:
+            return model.plot_radial(time, lon, field=field, save=save, tag=tag)
 
         if field not in ['cme', 'ambient', 'both']:
             print("Error, field must be either 'cme', or 'ambient'. Default to cme")
@@ -861,12 +1532,7 @@ class HUXt:
         ax.set_title(label, fontsize=20)
         ax.legend(loc=1)
         if save:
-            cr_num = np.int32(self.cr_num.value)
-            lon_tag = "{}deg".format(lon.to(u.deg).value)
-            filename = "HUXt_CR{:03d}_{}_{}_radial_profile_lon_{}_frame_{:03d}.png".format(cr_num, tag, field, lon_tag,
-                                                                                           id_t)
-            filepath = os.path.join(self._figure_dir_, filename)
-            fig.savefig(filepath)
+            fig.savefig(self._frame_filepath_(id_t, tag, field=field, lon=lon))
 
         return fig, ax
 
@@ -881,6 +1547,9 @@ class HUXt:
         :return: fig: Figure handle
         :return: ax: Axes handle
         """
+        model = self._plot_model_()
+        if model is not self:
+            return model.plot_timeseries(radius, lon, field=field, save=save, tag=tag)
 
         if field not in ['cme', 'ambient', 'both']:
             print("Error, field must be either 'cme', or 'ambient'. Default to cme")
@@ -943,6 +1612,89 @@ class HUXt:
 
         return fig, ax
 
+    def close(self):
+        """
+        Close the HDF5 file backing a model loaded with load_HUXt_run(filepath, lazy=True). This does nothing for
+        models that are solved or loaded into memory.
+        """
+        if getattr(self, '_file_', None) is not None:
+            self._file_.close()
+            self._file_ = None
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def interpolate_radial(self, r_out=None, field='cme'):
+        """
+        Linearly interpolate a solar wind speed solution onto other radii, such as a stretched grid solution onto a
+        uniform grid. Radii outside of the model grid take the speed at the nearest boundary.
+        :param r_out: Array of radii to interpolate to, with an astropy.unit of distance. Defaults to a uniform grid
+                      from the inner to outer boundary, with the models first radial step.
+        :param field: String, either 'cme', or 'ambient', specifying which solution to interpolate.
+        :return r_out: Array of the radii interpolated to (in solar radii).
+        :return v: Array of solar wind speeds of shape (nt_out, r_out.size, nlon), with a fourth dimension of latitude
+                   if nlat > 1 (in km/s).
+        """
+        if field not in ['cme', 'ambient']:
+            print("Error, field must be either 'cme', or 'ambient'. Default to cme")
+            field = 'cme'
+
+        if r_out is None:
+            r_out = radial_grid(r_min=self.r[0], r_max=self.r[-1], dr=self.dr)[0]
+
+        r_out = np.atleast_1d(r_out.to(u.solRad))
+        r_model = self.r.to_value(u.solRad)
+        id_hi = np.clip(np.searchsorted(r_model, r_out.value), 1, self.nr - 1)
+        id_lo = id_hi - 1
+        weight = (r_out.value - r_model[id_lo]) / (r_model[id_hi] - r_model[id_lo])
+        weight = np.clip(weight, 0.0, 1.0)
+
+        if field == 'cme':
+            v_grid = self.v_grid_cme.value
+        else:
+            v_grid = self.v_grid_amb.value
+
+        weight = weight.reshape((1, -1) + (1,) * (v_grid.ndim - 2))
+
+        v = (1.0 - weight) * v_grid[:, id_lo, :] + weight * v_grid[:, id_hi, :]
+        return r_out, v * self.kms
+
+    @u.quantity_input(lat=u.rad)
+    def latitude_slice(self, lat):
+        """
+        Get the model solution at the model latitude closest to lat, as a HUXt instance with a single latitude. This
+        shares the solar wind speed fields and CMEs of this model, rather than copying them. Models with more than one
+        latitude are plotted at the latitude closest to the equator, so other latitudes can be plotted with this.
+        :param lat: The latitude to find the closest model latitude to.
+        :return model: A HUXt instance with a single latitude.
+        """
+        if self.nlat == 1:
+            return self
+
+        id_lat = self._nearest_latitude_index_(lat)[0]
+        model = copy.copy(self)
+        model.lat = self.lat[id_lat:id_lat + 1]
+        model.nlat = 1
+        model.v_boundary = self.v_boundary[id_lat, :]
+        model.v_grid_cme = self.v_grid_cme[..., id_lat]
+        model.v_grid_amb = self.v_grid_amb[..., id_lat]
+        model._file_ = None
+        return model
+
+    def _nearest_latitude_index_(self, lat):
+        """
+        Find the indices of the model latitudes closest to a set of latitudes.
+        :param lat: Array of latitudes, with an astropy.unit of angle.
+        :return id_lat: Array of indices into model.lat.
+        """
+        lat = np.atleast_1d(lat.to(u.rad).value)
+        return np.argmin(np.abs(self._lat_[np.newaxis, :] - lat[:, np.newaxis]), axis=1)
+
     def get_observer(self, body):
         """
         Returns an instance of the Observer class, giving the HEEQ and Carrington coordinates at each model timestep.
@@ -953,11 +1705,256 @@ class HUXt:
         obs = Observer(body, times)
         return obs
 
+    def get_observers(self, bodies=("EARTH", "VENUS", "MERCURY", "STA", "STB")):
+        """
+        Returns the HEEQ and Carrington coordinates of several bodies at each model timestep, in one ephemeris lookup.
+        This is only well defined if the model was initialised with a Carrington rotation number.
+        :param bodies: List of strings of the bodies to look up. Valid bodies are Earth, Venus, Mercury, STA, and STB.
+        :return: Dictionary of body positions, as described in observer_positions.
+        """
+        times = self.time_init + self.time_out
+        return observer_positions(bodies, times)
+
+    def cme_arrival(self, radius, lon, lat=0.0 * u.rad):
+        """
+        Compute the arrival time, arrival speed and duration of each ConeCME at a set of fixed target points. This is
+        computed from the CME mask of the solution, with the flow of each CME told apart by tracing its front, so
+        doesn't need the CME tracking coordinates.
+        :param radius: Radius of each target point, with an astropy.unit of distance. Broadcast against lon.
+        :param lon: HEEQ Longitude of each target point, with an astropy.unit of angle. Broadcast against radius.
+        :param lat: HEEQ Latitude of each target point, with an astropy.unit of angle. The closest model latitude is
+                    used, so this is ignored by models with a single latitude. Broadcast against radius and lon.
+        :return: Dictionary with keys 't_arrive', 'v_arrive' and 'duration', each an array of shape (n_cme, n_target),
+                 in the same order as model.cmes. Values are NaN where a CME does not arrive at a target.
+        """
+        radius, lon, lat = np.broadcast_arrays(np.atleast_1d(radius.to(u.solRad)), np.atleast_1d(lon.to(u.rad)),
+                                               np.atleast_1d(lat.to(u.rad)), subok=True)
+        id_r, id_lon = self._nearest_grid_index_(radius, lon)
+        id_lat = self._nearest_latitude_index_(lat)
+        id_t = np.arange(self.nt_out).reshape((self.nt_out, 1))
+        return self._cme_arrival_(id_t, id_r.reshape((1, -1)), id_lon.reshape((1, -1)), id_lat.reshape((1, -1)))
+
+    def cme_arrival_at_observer(self, body):
+        """
+        Compute the arrival time, arrival speed and duration of each ConeCME at an observer. The observer position is
+        looked up at each output time step, so this is only well defined if the model was initialised with a
+        Carrington rotation number.
+        :param body: String specifying which body to look up. Valid bodies are Earth, Venus, Mercury, STA, and STB.
+        :return: Dictionary with keys 't_arrive', 'v_arrive' and 'duration', each an array of shape (n_cme, 1), in the
+                 same order as model.cmes. Values are NaN where a CME does not arrive at the observer.
+        """
+        obs = self.get_observer(body)
+        id_r, id_lon = self._nearest_grid_index_(obs.r, obs.lon)
+        id_lat = self._nearest_latitude_index_(obs.lat)
+        id_t = np.arange(self.nt_out).reshape((self.nt_out, 1))
+        return self._cme_arrival_(id_t, id_r.reshape((-1, 1)), id_lon.reshape((-1, 1)), id_lat.reshape((-1, 1)))
+
+    def _nearest_grid_index_(self, radius, lon):
+        """
+        Find the indices of the model radial and longitudinal grid points closest to a set of coordinates.
+        :param radius: Array of radial distances, with an astropy.unit of distance.
+        :param lon: Array of longitudes, with an astropy.unit of angle.
+        :return: id_r: Array of indices into model.r.
+        :return: id_lon: Array of indices into model.lon.
+        """
+        radius = np.atleast_1d(radius.to(self.r.unit).value)
+        lon = np.atleast_1d(lon.to(u.rad).value)
+        if np.any((radius < self.r.value.min()) | (radius > self.r.value.max())):
+            print("Warning, some target radii outside of model radial grid. Defaulting to closest radius")
+
+        id_r = np.argmin(np.abs(self.r.value[np.newaxis, :] - radius[:, np.newaxis]), axis=1)
+
+        # Angular separation on the circle, so that longitudes either side of 0/2pi are treated as neighbours.
+        model_lon = np.atleast_1d(self.lon.to(u.rad).value)
+        dlon = lon[:, np.newaxis] - model_lon[np.newaxis, :]
+        dlon = np.abs(np.arctan2(np.sin(dlon), np.cos(dlon)))
+        id_lon = np.argmin(dlon, axis=1)
+        if np.any(dlon[np.arange(lon.size), id_lon] > self.dlon.to(u.rad).value):
+            print("Warning, some target longitudes outside of model longitudes. Defaulting to closest longitude")
+
+        return id_r, id_lon
+
+    def _cme_arrival_(self, id_t, id_r, id_lon, id_lat):
+        """
+        Vectorised computation of CME arrival statistics at a set of target points. The CME flow along the radials of
+        the targets is attributed to the CMEs that drive it by tracing each CME front, so that CMEs which merge, or
+        whose flow splits, before reaching a target are each assigned their own arrival.
+        :param id_t: Array of time indices, broadcast against id_r, id_lon and id_lat to shape (nt_out, n_target).
+        :param id_r: Array of radial indices of the targets.
+        :param id_lon: Array of longitude indices of the targets.
+        :param id_lat: Array of latitude indices of the targets. Only used by models with more than one latitude.
+        :return: Dictionary with keys 't_arrive', 'v_arrive' and 'duration', each of shape (n_cme, n_target).
+        """
+        id_t, id_r, id_lon, id_lat = np.broadcast_arrays(id_t, id_r, id_lon, id_lat)
+        n_cme = len(self.cmes)
+        n_target = id_r.shape[1]
+        t_arrive = np.zeros((n_cme, n_target)) * np.NaN
+        v_arrive = np.zeros((n_cme, n_target)) * np.NaN
+        duration = np.zeros((n_cme, n_target)) * np.NaN
+
+        if n_cme > 0:
+            # Attribute the CME flow along each radial that the targets lie on.
+            radials, id_radial = np.unique(np.stack((id_lon.ravel(), id_lat.ravel())), axis=1, return_inverse=True)
+            id_radial = id_radial.reshape(id_r.shape)
+            if self.nlat == 1:
+                v_cme = self.v_grid_cme[:, :, radials[0]].value
+                v_amb = self.v_grid_amb[:, :, radials[0]].value
+            else:
+                v_cme = self.v_grid_cme[:, :, radials[0], radials[1]].value
+                v_amb = self.v_grid_amb[:, :, radials[0], radials[1]].value
+
+            lon = np.atleast_1d(self.lon.to(u.rad).value)[radials[0]]
+            lat = self.lat.to(u.rad).value[radials[1]]
+            cme_params = np.array([cme.parameter_array() for cme in self.cmes]).reshape((n_cme, 8))
+            time_out = self.time_out.to(u.s).value
+            owner = _cme_flow_owner_(v_cme, v_amb, self.r.to('km').value, time_out, lon, lat, cme_params)
+
+            target = np.arange(n_target)
+            for c in range(n_cme):
+                # A CME arrives at the first output time a target is in its flow, and stays until it next isn't.
+                in_cme = owner[c][id_t, id_r, id_radial]
+                arrived = np.any(in_cme, axis=0)
+                id_start = np.argmax(in_cme, axis=0)
+                left = ~in_cme & (id_t > id_start)
+                id_stop = np.where(np.any(left, axis=0), np.argmax(left, axis=0) - 1, self.nt_out - 1)
+                t_start = time_out[id_start]
+                t_stop = time_out[id_stop]
+                v_start = v_cme[id_start, id_r[id_start, target], id_radial[id_start, target]]
+                t_arrive[c, arrived] = t_start[arrived]
+                v_arrive[c, arrived] = v_start[arrived]
+                duration[c, arrived] = t_stop[arrived] - t_start[arrived]
+
+        arrival = {'t_arrive': t_arrive * u.s, 'v_arrive': v_arrive * self.kms, 'duration': duration * u.s}
+        return arrival
+
+
+# State of each frame rendering process used by HUXt.animate.
+_frame_worker_ = {}
+
+
+def _frame_worker_init_(model, field, render, export=None):
+    """
+    Initialise a frame rendering process, by building the persistent figure that all its frames are drawn on.
+    :param model: The HUXt instance to render.
+    :param field: String, either 'cme', or 'ambient', specifying which solution to render.
+    :param render: String, either 'contour', or 'mesh', specifying how the solution is drawn.
+    :param export: Dictionary of the tag, out_dir and radial_lon arguments of HUXt.export_frames, if exporting frames.
+    """
+    plt.switch_backend('agg')
+    _frame_worker_['model'] = model
+    _frame_worker_['artists'] = model._setup_plot_(field, 0, render=render)
+    _frame_worker_['export'] = export
+    return
+
+
+@functools.lru_cache(maxsize=16)
+def _polar_mesh_(r, nlon):
+    """
+    Compute the polar plotting coordinates of a model grid. Cached, as these only depend on the model grid.
+    The returned arrays are read-only, as they are shared between plots.
+    :param r: Tuple of the model radial grid, in solar radii.
+    :param nlon: Number of longitudes in the full longitude grid.
+    :return: Dictionary containing:
+             lon, rad: Meshes of the cell center longitudes and radii, padded to close the 0/2pi gap, for contouring.
+             lon_edges, r_edges: Longitudes and radii of the cell edges, for drawing a mesh of grid cells.
+    """
+    r = np.array(r)
+    lon_arr, dlon, nlon = longitude_grid(nlon=nlon)
+    lon_arr = lon_arr.value
+    dlon = dlon.value
+
+    lon, rad = np.meshgrid(np.append(lon_arr, lon_arr[0] + 2.0 * np.pi), r)
+    lon_edges = np.append(lon_arr - dlon / 2.0, lon_arr[-1] + dlon / 2.0)
+    r_mid = (r[1:] + r[:-1]) / 2.0
+    r_edges = np.hstack((r[0] - (r_mid[0] - r[0]), r_mid, r[-1] + (r[-1] - r_mid[-1])))
+    r_edges[r_edges < 0] = 0
+
+    mesh = {'lon': lon, 'rad': rad, 'lon_edges': lon_edges, 'r_edges': r_edges}
+    for array in mesh.values():
+        array.flags.writeable = False
+
+    return mesh
+
+
+def _frame_worker_render_(id_t):
+    """
+    Render one frame in a frame rendering process.
+    :param id_t: Index of the output time to render.
+    :return: RGB image array of the frame.
+    """
+    model = _frame_worker_['model']
+    artists = _frame_worker_['artists']
+    model._update_plot_(artists, id_t)
+    return _render_frame_(artists)
+
+
+def _frame_worker_export_(id_t):
+    """
+    Save one frame in a frame rendering process, for HUXt.export_frames.
+    :param id_t: Index of the output time to save.
+    :return: List of the paths of the saved files.
+    """
+    model = _frame_worker_['model']
+    return model._export_frame_(_frame_worker_['artists'], id_t, _frame_worker_['export'])
+
+
+def _render_frame_(artists):
+    """
+    Render a frame of a plot made by _setup_plot_. For the mesh renderer, the static parts of the figure are drawn
+    once and cached, and only the data dependent artists are redrawn over them for each frame.
+    :param artists: Dictionary of artists returned by _setup_plot_.
+    :return: Array of shape (height, width, 3) of the image.
+    """
+    fig = artists['fig']
+    if artists['render'] != 'mesh':
+        return _figure_to_rgb_(fig)
+
+    ax = artists['ax']
+    # Keep the drawing order of a full draw: field, grid, lines and markers, spines, then text.
+    gridlines = ax.xaxis.get_gridlines() + ax.yaxis.get_gridlines()
+    spines = list(ax.spines.values())
+    lines = artists['cme_lines'] + artists['obs_markers']
+    dynamic = [artists['field_image']] + gridlines + lines + spines + [artists['time_label']]
+
+    canvas = fig.canvas
+    if artists['background'] is None:
+        visible = [artist.get_visible() for artist in dynamic]
+        for artist in dynamic:
+            artist.set_visible(False)
+        canvas.draw()
+        artists['background'] = canvas.copy_from_bbox(fig.bbox)
+        for artist, vis in zip(dynamic, visible):
+            artist.set_visible(vis)
+
+    canvas.restore_region(artists['background'])
+    for artist in dynamic[:-1]:
+        ax.draw_artist(artist)
+    fig.draw_artist(artists['time_label'])
+    return np.asarray(canvas.buffer_rgba())[:, :, :3].copy()
+
+
+def _figure_to_rgb_(fig):
+    """
+    Draw a figure and return the image as an RGB array.
+    :param fig: A matplotlib figure with an Agg based canvas.
+    :return: Array of shape (height, width, 3) of the image.
+    """
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[:, :, :3].copy()
+
 
 def huxt_constants():
     """
     Return some constants used in all HUXt model classes
     """
+    return dict(_huxt_constants_())
+
+
+@functools.lru_cache(maxsize=1)
+def _huxt_constants_():
+    """
+    Compute the constants returned by huxt_constants. Cached, as these are used whenever a model or grid is set up.
+    """
     twopi = 2.0 * np.pi
     daysec = 24 * 60 * 60 * u.s
     kms = u.km / u.s
@@ -966,20 +1963,26 @@ def huxt_constants():
     synodic_period = 27.2753 * daysec  # Solar Synodic rotation period from Earth.
     v_max = 2000 * kms
     dr = 1.5 * u.solRad  # Radial grid step. With v_max, this sets the model time step.
+    cfl = 0.95 * u.dimensionless_unscaled  # Courant number of the time step in adaptive_dt mode.
+    v_init = 400 * kms  # Solar wind speed over the domain before the first iteration.
     constants = {'twopi': twopi, 'daysec': daysec, 'kms': kms, 'alpha': alpha,
                  'r_accel': r_accel, 'synodic_period': synodic_period, 'v_max': v_max,
-                 'dr': dr}
+                 'dr': dr, 'cfl': cfl, 'v_init': v_init}
     return constants
 
 
-@u.quantity_input(r_min=u.solRad)
-@u.quantity_input(r_max=u.solRad)
-def radial_grid(r_min=30.0 * u.solRad, r_max=240. * u.solRad):
+@u.quantity_input(r_min=u.solRad, r_max=u.solRad, dr=u.solRad)
+def radial_grid(r_min=30.0 * u.solRad, r_max=240. * u.solRad, dr=np.NaN * u.solRad, dr_stretch=1.0):
     """
-    Define the radial grid of the HUXt model. Step size is fixed, but inner and outer boundary may be specified.
+    Define the radial grid of the HUXt model. The inner and outer boundary and the step size may be specified. The
+    grid can be stretched, so that each step is dr_stretch times the last, to be fine near the inner boundary and
+    coarse further out.
 
     :param r_min: The heliocentric distance of the inner radial boundary
     :param r_max: The heliocentric distance of the outer radial boundary
+    :param dr: The radial grid step, or for a stretched grid the shortest first step. Defaults to the dr of
+               huxt_constants.
+    :param dr_stretch: Ratio of each radial grid step to the previous, 1 for a uniform grid.
     """
     if r_min >= r_max:
         print("Warning, r_min cannot be less than r_max. Defaulting to r_min=30rs and r_max=240rs")
@@ -994,57 +1997,106 @@ def radial_grid(r_min=30.0 * u.solRad, r_max=240. * u.solRad):
         print("Warning, r_max should not be more than 400rs. Defaulting to 400rs")
         r_max = 400 * u.solRad
 
-    constants = huxt_constants()
-    dr = constants['dr']
-    r = np.arange(r_min.value, r_max.value + dr.value, dr.value)
-    r = r * dr.unit
+    if np.isnan(dr):
+        dr = huxt_constants()['dr']
+    elif dr <= 0 * u.solRad:
+        print("Warning, dr must be positive. Defaulting to dr={}".format(huxt_constants()['dr']))
+        dr = huxt_constants()['dr']
+
+    if dr_stretch < 1.0:
+        print("Warning, dr_stretch cannot be less than 1. Defaulting to dr_stretch=1")
+        dr_stretch = 1.0
+
+    dr = dr.to(u.solRad)
+    r, rrel = _radial_grid_(r_min.to_value(dr.unit), r_max.to_value(dr.unit), dr.value, float(dr_stretch))
+    r = u.Quantity(r, dr.unit, copy=False)
+    rrel = u.Quantity(rrel, dr.unit, copy=False)
     nr = r.size
-    rrel = r - r[0]
     return r, dr, rrel, nr
 
 
-@u.quantity_input(lon_out=u.rad)
-@u.quantity_input(lon_start=u.rad)
-@u.quantity_input(lon_stop=u.rad)
-def longitude_grid(lon_out=np.NaN * u.rad, lon_start=np.NaN * u.rad, lon_stop=np.NaN * u.rad):
+@functools.lru_cache(maxsize=32)
+def _radial_grid_(r_min, r_max, dr, dr_stretch):
+    """
+    Compute the radial grid for radial_grid. Cached, so models with the same grid share the same read-only arrays.
+    :param r_min: The inner radial boundary, in units of dr.
+    :param r_max: The outer radial boundary, in units of dr.
+    :param dr: The radial grid step, or the first step of a stretched grid.
+    :param dr_stretch: Ratio of each radial grid step to the previous.
+    :return r: The radial grid.
+    :return rrel: The radial grid relative to the inner boundary.
+    """
+    if dr_stretch == 1.0:
+        r = np.arange(r_min, r_max + dr, dr)
+    else:
+        # Geometric steps, as many as fit between r_min and r_max. These are then scaled up to end exactly at r_max, so
+        # that no step is shorter than it would otherwise be, and the time step still satisfies the CFL condition.
+        n_step = np.int64(np.floor(np.log(1.0 + (r_max - r_min) * (dr_stretch - 1.0) / dr) / np.log(dr_stretch)))
+        n_step = max(n_step, 1)
+        r = r_min + (r_max - r_min) * (dr_stretch ** np.arange(n_step + 1) - 1.0) / (dr_stretch ** n_step - 1.0)
+        r[-1] = r_max
+
+    rrel = r - r[0]
+    r.flags.writeable = False
+    rrel.flags.writeable = False
+    return r, rrel
+
+
+@u.quantity_input(lon_out=u.rad, lon_start=u.rad, lon_stop=u.rad)
+def longitude_grid(lon_out=np.NaN * u.rad, lon_start=np.NaN * u.rad, lon_stop=np.NaN * u.rad, nlon=128):
     """
     Define the longitude grid of the HUXt model.
 
     :param lon_out:
     :param lon_start: The first longitude (in a clockwise sense) of a longitude range
     :param lon_stop: The last longitude (in a clockwise sense) of a longitude range
+    :param nlon: Number of longitudes in the full longitude grid.
+    """
+    # The grid is cached on the longitudes in radians. Unset longitudes are passed as None, as NaN can't be matched.
+    lons = [lon.to_value(u.rad) if np.isfinite(lon) else None for lon in [lon_out, lon_start, lon_stop]]
+    lon, dlon, nlon = _longitude_grid_(*lons, int(nlon))
+    return u.Quantity(lon, u.rad, copy=False), dlon * u.rad, nlon
+
+
+@functools.lru_cache(maxsize=64)
+def _longitude_grid_(lon_out, lon_start, lon_stop, nlon_full):
+    """
+    Compute the longitude grid for longitude_grid. Cached, so models with the same grid share the same read-only
+    arrays.
+    :param lon_out: A single longitude to select, in radians, or None.
+    :param lon_start: The first longitude (in a clockwise sense) of a longitude range, in radians, or None.
+    :param lon_stop: The last longitude (in a clockwise sense) of a longitude range, in radians, or None.
+    :param nlon_full: Number of longitudes in the full longitude grid.
+    :return lon: The longitude grid, in radians.
+    :return dlon: The longitude grid step, in radians.
+    :return nlon: The number of longitudes.
     """
     # Check the inputs.
     twopi = 2.0 * np.pi
     single_longitude = False
     longitude_range = False
-    if np.isfinite(lon_out):
+    if lon_out is not None:
         # Select single longitude only. Check in range
-        if (lon_out < 0 * u.rad) | (lon_out > twopi * u.rad):
-            lon_out = _zerototwopi_(lon_out.to('rad').value)
-            lon_out = lon_out * u.rad
+        if (lon_out < 0) | (lon_out > twopi):
+            lon_out = _zerototwopi_(lon_out)
 
         single_longitude = True
-    elif np.isfinite(lon_start) & np.isfinite(lon_stop):
+    elif (lon_start is not None) & (lon_stop is not None):
         # Select a range of longitudes. Check limits in range.
-        if (lon_start < 0 * u.rad) | (lon_start > twopi * u.rad):
-            lon_start = _zerototwopi_(lon_start.to('rad').value)
-            lon_start = lon_start * u.rad
+        if (lon_start < 0) | (lon_start > twopi):
+            lon_start = _zerototwopi_(lon_start)
 
-        if (lon_stop < 0 * u.rad) | (lon_stop > twopi * u.rad):
-            lon_stop = _zerototwopi_(lon_stop.to('rad').value)
-            lon_stop = lon_stop * u.rad
+        if (lon_stop < 0) | (lon_stop > twopi):
+            lon_stop = _zerototwopi_(lon_stop)
 
         longitude_range = True
 
     # Form the full longitude grid.
-    nlon = 128
+    nlon = nlon_full
     dlon = twopi / nlon
     lon_min_full = dlon / 2.0
     lon_max_full = twopi - (dlon / 2.0)
     lon, dlon = np.linspace(lon_min_full, lon_max_full, nlon, retstep=True)
-    lon = lon * u.rad
-    dlon = dlon * u.rad
 
     # Now get only the selected longitude or range of longitudes
     if single_longitude:
@@ -1064,32 +2116,51 @@ def longitude_grid(lon_out=np.NaN * u.rad, lon_start=np.NaN * u.rad, lon_stop=np
         lon = lon[id_match]
         nlon = lon.size
 
+    if isinstance(lon, np.ndarray):
+        lon.flags.writeable = False
+
     return lon, dlon, nlon
 
 
-def time_grid(simtime, dt_scale):
+def time_grid(simtime, dt_scale, dr=None):
     """
     Define the model timestep and time grid based on CFL condition and specified simulation time.
 
     :param simtime: The length of the simulation
     :param dt_scale: An integer specifying how frequently model timesteps should be saved to output.
+    :param dr: The smallest radial grid step, which sets the time step. Defaults to the dr of huxt_constants.
+    """
+    dt_scale = u.Quantity(dt_scale, u.dimensionless_unscaled).value
+    if dr is None:
+        dr = huxt_constants()['dr']
+    return dict(_time_grid_(simtime.to_value(u.s), dt_scale, dr.to_value(u.solRad)))
+
+
+@functools.lru_cache(maxsize=32)
+def _time_grid_(simtime, dt_scale, dr):
+    """
+    Compute the time grid for time_grid. Cached, so models with the same time grid share the same read-only arrays.
+    :param simtime: The length of the simulation, in seconds.
+    :param dt_scale: An integer specifying how frequently model timesteps should be saved to output.
+    :param dr: The smallest radial grid step, in solar radii.
     """
     constants = huxt_constants()
     v_max = constants['v_max']
-    dr = constants['dr']
-    dr = dr.to('km')
+    dr = (dr * u.solRad).to('km')
     dt = (dr / v_max).to('s')
     dtdr = dt / dr
 
-    nt = np.int32(np.floor(simtime.to(dt.unit) / dt))  # number of time steps in the simulation
-    time = np.arange(0, nt) * dt  # Model time steps
+    nt = np.int32(np.floor(simtime / dt.value))  # number of time steps in the simulation
+    time = np.arange(0, nt) * dt.value  # Model time steps
 
     dt_out = dt_scale * dt  # time step of the output
     nt_out = np.int32(nt / dt_scale)  # number of time steps in the output
-    time_out = np.arange(0, nt_out) * dt_out  # Output time steps
+    time_out = np.arange(0, nt_out) * dt_out.value  # Output time steps
 
-    time_grid_dict = {'dt': dt, 'dtdr': dtdr, 'Nt': nt, 'time': time,
-                      'dt_out': dt_out, 'nt_out': nt_out, 'time_out': time_out}
+    time.flags.writeable = False
+    time_out.flags.writeable = False
+    time_grid_dict = {'dt': dt, 'dtdr': dtdr, 'Nt': nt, 'time': u.Quantity(time, dt.unit, copy=False),
+                      'dt_out': dt_out, 'nt_out': nt_out, 'time_out': u.Quantity(time_out, dt.unit, copy=False)}
     return time_grid_dict
 
 
@@ -1097,19 +2168,29 @@ def _setup_dirs_():
     """
     Function to pull out the directories of boundary conditions, ephemeris, and to save figures and output data.
     """
+    return dict(_read_config_(os.getcwd()))
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config_(cwd):
+    """
+    Read the project directories from the config.dat file in a directory. Cached, so the config file is only parsed
+    once per process for each working directory.
+    :param cwd: The directory to look for config.dat in.
+    """
     # Find the config.dat file path
-    files = glob.glob('config.dat')
+    files = glob.glob(os.path.join(glob.escape(cwd), 'config.dat'))
 
     if len(files) != 1:
         # If wrong number of config files, guess directories
         print('Error: Cannot find correct config file with project directories. Check config.dat exists')
         print('Defaulting to current directory')
-        dirs = {'root': os.getcwd()}
+        dirs = {'root': cwd}
         for rel_path in ['boundary_conditions', 'ephemeris', 'HUXt_data', 'HUXt_figures']:
             if rel_path == 'ephemeris':
-                dirs[rel_path] = os.path.join(os.getcwd(), "ephemeris.hdf5")
+                dirs[rel_path] = os.path.join(cwd, "ephemeris.hdf5")
             else:
-                dirs[rel_path] = os.getcwd()
+                dirs[rel_path] = cwd
     else:
         # Extract data and figure directories from config.dat
         with open(files[0], 'r') as file:
@@ -1125,10 +2206,307 @@ def _setup_dirs_():
     return dirs
 
 
-@jit(nopython=True)
+@functools.lru_cache(maxsize=256)
+def _carrington_rotation_time_(cr_frac):
+    """
+    Get the UTC time of a fractional Carrington rotation number. Cached, as the sunpy calculation is repeated for every
+    model built on the same Carrington rotation and longitude. The returned Time is shared, so copy it before
+    modifying it in place.
+    :param cr_frac: Fractional Carrington rotation number.
+    :return: Astropy Time of the Carrington rotation.
+    """
+    return sun.carrington_rotation_time(cr_frac)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_ephemeris_(ephemeris_file):
+    """
+    Read the positions of all bodies in the ephemeris file into memory. Cached, so the ephemeris is read once per
+    process. Longitudes are converted to radians and unwrapped, so they can be linearly interpolated directly.
+    The returned arrays are read-only, as they are shared between callers.
+    :param ephemeris_file: Full path to the ephemeris file.
+    :return: Dictionary with a dictionary for each body, containing:
+             jd: Array of ephemeris times, as Julian dates.
+             uniform: Boolean, True if the ephemeris times are evenly spaced.
+             coords: Array of shape (2, 3, n_time), giving the radius (km), longitude (rad) and latitude (rad), in the
+                     HEEQ (first row) and Carrington (second row) frames.
+    """
+    ephemeris = {}
+    with h5py.File(ephemeris_file, 'r') as ephem:
+        for body in ephem.keys():
+            jd = ephem[body]['HEEQ']['time'][()]
+            coords = np.zeros((2, 3, jd.size))
+            for i, frame in enumerate(['HEEQ', 'CARR']):
+                coords[i, 0, :] = ephem[body][frame]['radius'][()]
+                coords[i, 1, :] = np.unwrap(np.deg2rad(ephem[body][frame]['longitude'][()]))
+                coords[i, 2, :] = np.deg2rad(ephem[body][frame]['latitude'][()])
+
+            djd = np.diff(jd)
+            uniform = (jd.size > 1) and np.allclose(djd, djd[0], rtol=0, atol=1e-6)
+            jd.flags.writeable = False
+            coords.flags.writeable = False
+            ephemeris[body] = {'jd': jd, 'uniform': uniform, 'coords': coords}
+
+    return ephemeris
+
+
+def _check_body_(body):
+    """
+    Check a body is one of those in the ephemeris, defaulting to Earth if not.
+    :param body: String name of the body.
+    :return: The upper case name of the body, or "EARTH" if the body is not recognised.
+    """
+    bodies = ["EARTH", "VENUS", "MERCURY", "STA", "STB"]
+    if body.upper() in bodies:
+        return body.upper()
+
+    print("Warning, body {} not recognised.".format(body))
+    print("Only {} are valid.".format(bodies))
+    print("Defaulting to Earth")
+    return "EARTH"
+
+
+def _interp_ephemeris_(ephem, jd, weights=None):
+    """
+    Linearly interpolate the coordinates of a body in the ephemeris to a set of times.
+    :param ephem: The dictionary of a body returned by _read_ephemeris_.
+    :param jd: Array of times to interpolate to, as Julian dates.
+    :param weights: The interpolation indices and weights of jd, as returned by _ephemeris_weights_. These are
+                    computed if not given, but can be shared by bodies with a common ephemeris time grid.
+    :return: Array of shape (2, 3, jd.size) of the interpolated coordinates, in the same layout as ephem['coords'].
+             Times outside of the ephemeris are NaN.
+    """
+    shape = np.shape(jd)
+    if weights is None:
+        weights = _ephemeris_weights_(ephem, np.atleast_1d(jd))
+
+    id_lo, weight, outside = weights
+    coords = ephem['coords']
+    coords_out = coords[:, :, id_lo] * (1.0 - weight) + coords[:, :, id_lo + 1] * weight
+    coords_out[:, :, outside] = np.NaN
+    return coords_out.reshape((2, 3) + shape)
+
+
+def _ephemeris_weights_(ephem, jd):
+    """
+    Find the linear interpolation indices and weights of a set of times in the ephemeris of a body. For evenly spaced
+    ephemeris times, the indices are computed directly, rather than searched for.
+    :param ephem: The dictionary of a body returned by _read_ephemeris_.
+    :param jd: Array of times to interpolate to, as Julian dates.
+    :return: id_lo: Array of indices of the ephemeris time before each time.
+    :return: weight: Array of interpolation weights of the ephemeris time after each time.
+    :return: outside: Boolean array, True for times outside of the ephemeris.
+    """
+    all_jd = ephem['jd']
+    n_jd = all_jd.size
+    if ephem['uniform']:
+        pos = (jd - all_jd[0]) * ((n_jd - 1) / (all_jd[-1] - all_jd[0]))
+    else:
+        pos = np.interp(jd, all_jd, np.arange(n_jd), left=-1, right=n_jd)
+
+    outside = (pos < 0) | (pos > n_jd - 1)
+    if np.any(outside):
+        print("Warning, some times outside of the ephemeris. These positions are NaN")
+
+    id_lo = np.clip(np.floor(pos).astype(np.int64), 0, n_jd - 2)
+    weight = pos - id_lo
+    return id_lo, weight, outside
+
+
+def observer_positions(bodies, times):
+    """
+    Look up the positions of several bodies at a set of times in one call. This reads the cached ephemeris once, and
+    bodies with a common ephemeris time grid share the interpolation indices.
+    :param bodies: List of strings of the bodies to look up. Valid bodies are Earth, Venus, Mercury, STA, and STB. As
+                   for Observer, a body that isn't recognised defaults to Earth.
+    :param times: Astropy Time, or array of Times, to interpolate the coordinates of the bodies to. Positions at times
+                  outside of the ephemeris are NaN, and a warning is printed.
+    :return: Dictionary containing:
+             bodies: List of the body names, giving the order of the first dimension of the coordinate arrays.
+             frames: List of the frames, ['HEEQ', 'CARR'], giving the order of the second dimension.
+             time: The input times.
+             r: Radius of each body, with shape (n_body, 2) + times.shape, in solar radii.
+             lon: Longitude of each body, in the 0-2pi domain, with shape (n_body, 2) + times.shape, in radians.
+             lat: Latitude of each body, with shape (n_body, 2) + times.shape, in radians.
+    """
+    bodies = [_check_body_(body) for body in bodies]
+
+    dirs = _setup_dirs_()
+    ephemeris = _read_ephemeris_(dirs['ephemeris'])
+
+    shape = np.shape(times.jd)
+    jd = np.atleast_1d(times.jd)
+    coords = np.zeros((len(bodies), 2, 3, jd.size))
+    weights = {}
+    for b, body in enumerate(bodies):
+        ephem = ephemeris[body]
+        grid_key = (ephem['jd'][0], ephem['jd'][-1], ephem['jd'].size, ephem['uniform'])
+        if grid_key not in weights:
+            weights[grid_key] = _ephemeris_weights_(ephem, jd)
+
+        coords[b] = _interp_ephemeris_(ephem, jd, weights[grid_key])
+
+    coords = coords.reshape((len(bodies), 2, 3) + shape)
+    positions = {'bodies': bodies, 'frames': ['HEEQ', 'CARR'], 'time': times,
+                 'r': (coords[:, :, 0] * u.km).to(u.solRad),
+                 'lon': _zerototwopi_(coords[:, :, 1].ravel()).reshape(coords[:, :, 1].shape) * u.rad,
+                 'lat': coords[:, :, 2] * u.rad}
+    return positions
+
+
+def _boundary_archive_path_(boundary_dir):
+    """
+    Return the path of the consolidated boundary condition archive in a boundary condition directory.
+    :param boundary_dir: Directory containing the boundary condition files.
+    """
+    return os.path.join(boundary_dir, "HUXt_boundary_archive.hdf5")
+
+
+def pack_boundary_conditions(boundary_dir=None):
+    """
+    Pack the individual CR*.hdf5 boundary condition files into a single indexed archive, which HUXt then uses for
+    boundary condition lookups. The archive holds a v_boundary dataset with one row per Carrington rotation, and a
+    cr_num dataset giving the Carrington rotation number of each row, in ascending order.
+    :param boundary_dir: Directory containing the boundary condition files. Defaults to the config.dat directory.
+    :return archive_file: Full path to the archive file.
+    """
+    if boundary_dir is None:
+        boundary_dir = _setup_dirs_()['boundary_conditions']
+
+    files = sorted(glob.glob(os.path.join(boundary_dir, "CR*.hdf5")))
+    cr_nums = []
+    v_boundaries = []
+    unit = None
+    for boundary_file in files:
+        cr_tag = os.path.splitext(os.path.basename(boundary_file))[0]
+        if not cr_tag[2:].isdigit():
+            continue
+
+        with h5py.File(boundary_file, 'r') as data:
+            v_boundary = data['v_boundary'][()] * u.Unit(data['v_boundary'].attrs['unit'])
+
+        if unit is None:
+            unit = v_boundary.unit
+
+        cr_nums.append(np.int32(cr_tag[2:]))
+        v_boundaries.append(v_boundary.to(unit).value)
+
+    if len(cr_nums) == 0:
+        print("Warning: No boundary condition files found in {}".format(boundary_dir))
+        return None
+
+    cr_nums = np.array(cr_nums, dtype=np.int32)
+    v_boundaries = np.array(v_boundaries)
+    id_sort = np.argsort(cr_nums)
+
+    archive_file = _boundary_archive_path_(boundary_dir)
+    with h5py.File(archive_file, 'w') as out_file:
+        dset = out_file.create_dataset('cr_num', data=cr_nums[id_sort])
+        dset.dims[0].label = 'carrington_rotation'
+        dset = out_file.create_dataset('v_boundary', data=v_boundaries[id_sort])
+        dset.attrs['unit'] = unit.to_string()
+        dset.dims[0].label = 'carrington_rotation'
+        dset.dims[1].label = 'longitude'
+
+    # Lookups made before the archive existed are now stale.
+    _read_boundary_archive_.cache_clear()
+    _read_boundary_.cache_clear()
+    return archive_file
+
+
+def load_boundary_archive(boundary_dir=None):
+    """
+    Load every boundary condition in the boundary condition archive in one read. Useful for sweeping over many
+    Carrington rotations. The archive must first be made with pack_boundary_conditions.
+    :param boundary_dir: Directory containing the boundary condition archive. Defaults to the config.dat directory.
+    :return cr_num: Array of Carrington rotation numbers.
+    :return v_boundary: Array of boundary conditions, with one row per Carrington rotation (in km/s).
+    """
+    if boundary_dir is None:
+        boundary_dir = _setup_dirs_()['boundary_conditions']
+
+    archive = _read_boundary_archive_(_boundary_archive_path_(boundary_dir))
+    if archive is None:
+        print("Warning: No boundary archive in {}. Run pack_boundary_conditions first.".format(boundary_dir))
+        return None, None
+
+    cr_nums, v_boundaries, unit = archive
+    return cr_nums.copy(), (v_boundaries * unit).to(u.km / u.s)
+
+
+def load_boundary(cr_num, boundary_dir=None):
+    """
+    Load the boundary condition of a Carrington rotation. This uses the boundary condition archive if it exists, or
+    else the individual CR*.hdf5 file. Lookups are cached for the life of the process.
+    :param cr_num: Integer Carrington rotation number.
+    :param boundary_dir: Directory containing the boundary conditions. Defaults to the config.dat directory.
+    :return v_boundary: The boundary condition (in km/s), or None if it is not found.
+    """
+    if boundary_dir is None:
+        boundary_dir = _setup_dirs_()['boundary_conditions']
+
+    boundary = _read_boundary_(boundary_dir, int(cr_num))
+    if boundary is None:
+        return None
+
+    v_boundary, unit = boundary
+    return (v_boundary * unit).to(u.km / u.s)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_boundary_archive_(archive_file):
+    """
+    Read the whole boundary condition archive into memory. Cached, so the archive is read once per process.
+    The returned arrays are read-only, as they are shared between callers.
+    :param archive_file: Full path to the archive file.
+    :return: Tuple of the cr_num array, v_boundary array and unit, or None if the archive doesn't exist.
+    """
+    if not os.path.isfile(archive_file):
+        return None
+
+    with h5py.File(archive_file, 'r') as data:
+        cr_nums = data['cr_num'][()]
+        v_boundaries = data['v_boundary'][()]
+        unit = u.Unit(data['v_boundary'].attrs['unit'])
+
+    cr_nums.flags.writeable = False
+    v_boundaries.flags.writeable = False
+    return cr_nums, v_boundaries, unit
+
+
+@functools.lru_cache(maxsize=1024)
+def _read_boundary_(boundary_dir, cr_num):
+    """
+    Look up the boundary condition of a Carrington rotation, in the archive if it exists or else in the individual
+    CR*.hdf5 file. Cached, so each rotation is read once per process. The returned array is read-only, as it is shared
+    between callers.
+    :param boundary_dir: Directory containing the boundary conditions.
+    :param cr_num: Integer Carrington rotation number.
+    :return: Tuple of the v_boundary array and unit, or None if it is not found.
+    """
+    archive = _read_boundary_archive_(_boundary_archive_path_(boundary_dir))
+    if archive is not None:
+        cr_nums, v_boundaries, unit = archive
+        id_cr = np.searchsorted(cr_nums, cr_num)
+        if (id_cr < cr_nums.size) and (cr_nums[id_cr] == cr_num):
+            return v_boundaries[id_cr], unit
+
+    boundary_file = os.path.join(boundary_dir, "CR{:03d}.hdf5".format(cr_num))
+    if not os.path.exists(boundary_file):
+        return None
+
+    with h5py.File(boundary_file, 'r') as data:
+        v_boundary = data['v_boundary'][()]
+        unit = u.Unit(data['v_boundary'].attrs['unit'])
+
+    v_boundary.flags.writeable = False
+    return v_boundary, unit
+
+
 def _zerototwopi_(angles):
     """
-    Function to constrain angles to the 0 - 2pi domain.
+    Function to constrain angles to the 0 - 2pi domain. This only uses numpy operations, so works on scalars and arrays
+    of any shape, without the cost of setting up numba when HUXt is imported.
 
     :param angles: a numpy array of angles
     :return: a numpy array of angles
@@ -1140,8 +2518,64 @@ def _zerototwopi_(angles):
     return angles_out
 
 
-@jit(nopython=True)
-def solve_radial(vinput, model_time, rrel, lon, params, do_cme, cme_params):
+# Kilometers in a solar radius, for converting the radial grid, held in solar radii, in the solvers.
+_solrad_km_ = u.solRad.to(u.km)
+
+# Explicit signatures of the numba solvers, which are compiled by warmup and cached on disk, so later processes load
+# them rather than compiling. Input arrays are declared read-only, which also accepts writeable arrays, so the cached
+# read-only model grids can be passed without copying.
+_ro_array_1d_ = types.Array(types.float64, 1, 'A', readonly=True)
+_ro_array_2d_ = types.Array(types.float64, 2, 'A', readonly=True)
+_solve_radial_signature_ = types.Tuple((types.float64[:, ::1], types.float64[:, ::1]))(
+    _ro_array_1d_, _ro_array_1d_, _ro_array_1d_, _ro_array_1d_, types.float64, types.float64, _ro_array_1d_,
+    types.int64, _ro_array_2d_, _ro_array_1d_, _ro_array_1d_)
+# solve_radials writes into the output storage, so is compiled for both storage dtypes.
+_solve_radials_signatures_ = [types.void(
+    _ro_array_2d_, _ro_array_1d_, _ro_array_1d_, _ro_array_1d_, _ro_array_1d_, types.float64, _ro_array_1d_,
+    types.int64, _ro_array_2d_, _ro_array_2d_, _ro_array_1d_, types.Array(dtype, 3, 'A'), types.Array(dtype, 3, 'A'))
+    for dtype in [types.float64, types.float32]]
+_upwind_step_signature_ = types.float64[::1](_ro_array_1d_, _ro_array_1d_, _ro_array_1d_, types.float64,
+                                             types.float64, _ro_array_1d_)
+_cone_cme_boundary_signature_ = types.float64(types.float64, types.float64, types.float64, types.float64,
+                                              types.float64, _ro_array_1d_)
+_semi_lagrangian_step_signature_ = types.float64[::1](_ro_array_1d_, types.float64, types.float64, types.float64,
+                                                      types.float64, _ro_array_1d_, _ro_array_1d_, types.float64,
+                                                      types.float64, types.float64, types.int64, _ro_array_2d_)
+
+
+@jit(nopython=True, cache=True)
+def solve_radials(vinput, model_time, rrel, dtdr, lon, lat, params, do_cme, cme_params, v_init, out_index,
+                  v_grid_amb, v_grid_cme):
+    """
+    Solve a batch of radial profiles at one latitude with solve_radial, writing each solution straight into the output
+    arrays, so no temporary copy of the whole output is made.
+
+    :param vinput: Array of the timeseries of inner boundary solar wind speeds of each radial, of shape (n_lon, n_time).
+    :param model_time: Array of model timesteps
+    :param rrel: Array of model radial coordinates relative to inner boundary coordinate
+    :param dtdr: Array of the ratio of the model time step to the radial step of each grid cell, in s/km.
+    :param lon: Array of the longitude of each radial
+    :param lat: The latitude of the radials
+    :param params: Array of HUXt parameters
+    :param do_cme: Boolean, if True any provided ConeCMEs are included in the solution.
+    :param cme_params: Array of ConeCME parameters to include in the solution, as for solve_radial.
+    :param v_init: Array of the initial radial profile of solar wind speed of each radial, of shape (n_lon, nr).
+    :param out_index: Increasing array of the model iterations to save to output, as for solve_radial.
+    :param v_grid_amb: Array to write the ambient solutions of each radial to, of shape (nt_out, nr, n_lon). This can
+                       be a view of the model output, in float64 or float32.
+    :param v_grid_cme: Array to write the solutions including ConeCMEs of each radial to, of shape (nt_out, nr, n_lon).
+    """
+    for i in range(lon.size):
+        v_amb, v_cme = solve_radial(vinput[i, :], model_time, rrel, dtdr, lon[i], lat, params, do_cme, cme_params,
+                                    v_init[i, :], out_index)
+        v_grid_amb[:, :, i] = v_amb
+        v_grid_cme[:, :, i] = v_cme
+
+    return
+
+
+@jit(nopython=True, cache=True)
+def solve_radial(vinput, model_time, rrel, dtdr, lon, lat, params, do_cme, cme_params, v_init, out_index):
     """
     Solve the radial profile as a function of time (including spinup), and return radial profile at specified
     output timesteps.
@@ -1149,32 +2583,46 @@ def solve_radial(vinput, model_time, rrel, lon, params, do_cme, cme_params):
     :param vinput: Timeseries of inner boundary solar wind speeds
     :param model_time: Array of model timesteps
     :param rrel: Array of model radial coordinates relative to inner boundary coordinate
+    :param dtdr: Array of the ratio of the model time step to the radial step of each grid cell, in s/km.
     :param lon: The longitude of this radial
+    :param lat: The latitude of this radial, used in computing the ConeCME boundary conditions.
     :param params: Array of HUXt parameters
     :param do_cme: Boolean, if True any provided ConeCMEs are included in the solution.
     :param cme_params: Array of ConeCME parameters to include in the solution. 1 Row for each CME, with columns as
                        required by _cone_cme_boundary_
+    :param v_init: Initial radial profile of solar wind speed, before the first iteration. This is 400 km/s
+                   everywhere at the start of the spin up.
+    :param out_index: Increasing array of the model iterations to save to output, which may be fractional. Fractional
+                      iterations are linearly interpolated between the solutions of the iterations either side, and
+                      the initial profile counts as iteration -1.
 
     Returns:
 
     """
     # Main model loop
     # ----------------------------------------------------------------------------------------
-    dtdr = params[0]
     alpha = params[1]
     r_accel = params[2]
-    dt_scale = np.int32(params[3])
     nt_out = np.int32(params[4])
     nr = np.int32(params[5])
     r_boundary = params[7]
+    scheme = np.int32(params[8])
+    dt = params[9]
 
-    lat = 0.0  # This is used in computing the ConeCME boundary condtions, which
+    # Residual acceleration factor at each radius, and the stretched radial coordinate in km, used by the
+    # semi-Lagrangian scheme.
+    accel = 1.0 + alpha * (1.0 - np.exp(-rrel / r_accel))
+    xi = (r_accel * _solrad_km_ / (1.0 + alpha)) * np.log((1.0 + alpha) * np.exp(rrel / r_accel) - alpha)
+    xi = xi - xi[0]
 
     # Preallocate space for solutions
     v_grid_amb = np.zeros((nt_out, nr))
     v_grid_cme = np.zeros((nt_out, nr))
 
-    iter_count = 0
+    # Solutions of the previous iteration, only kept when the next output lies between iterations.
+    v_amb_prev = v_init.copy()
+    v_cme_prev = v_init.copy()
+
     t_out = 0
 
     for t, time in enumerate(model_time):
@@ -1182,8 +2630,8 @@ def solve_radial(vinput, model_time, rrel, lon, params, do_cme, cme_params):
         # Get the initial condition, which will update in the loop,
         # and snapshots saved to output at right steps.
         if t == 0:
-            v_cme = np.ones(nr) * 400
-            v_amb = np.ones(nr) * 400
+            v_cme = v_init.copy()
+            v_amb = v_init.copy()
 
         # Update the inner boundary conditions
         v_amb[0] = vinput[t]
@@ -1200,40 +2648,54 @@ def solve_radial(vinput, model_time, rrel, lon, params, do_cme, cme_params):
 
                 v_cme[0] = v_update_cme.max()
 
-        # update cone cme v(r) for the given longitude
-        # =====================================
-        u_up = v_cme[1:].copy()
-        u_dn = v_cme[:-1].copy()
-        u_up_next = _upwind_step_(u_up, u_dn, dtdr, alpha, r_accel, rrel)
-        # Save the updated time step
-        v_cme[1:] = u_up_next.copy()
-
-        u_up = v_amb[1:].copy()
-        u_dn = v_amb[:-1].copy()
-        u_up_next = _upwind_step_(u_up, u_dn, dtdr, alpha, r_accel, rrel)
-        # Save the updated time step
-        v_amb[1:] = u_up_next.copy()
-
-        # Save this frame to output if output
-        if time >= 0:
-            iter_count = iter_count + 1
-            if iter_count == dt_scale:
-                if t_out <= nt_out - 1:
-                    v_grid_amb[t_out, :] = v_amb.copy()
-                    v_grid_cme[t_out, :] = v_cme.copy()
-                    t_out = t_out + 1
-                    iter_count = 0
+        if scheme == 1:
+            # Semi-Lagrangian update, with the ambient boundary at the next step for the wind entering in this step.
+            v_next = vinput[min(t + 1, vinput.size - 1)]
+            v_cme[:] = _semi_lagrangian_step_(v_cme, vinput[t], v_next, time, dt, xi, accel, lon, lat,
+                                              r_boundary, do_cme, cme_params)
+            v_amb[:] = _semi_lagrangian_step_(v_amb, vinput[t], v_next, time, dt, xi, accel, lon, lat,
+                                              r_boundary, 0, cme_params)
+        else:
+            # update cone cme v(r) for the given longitude
+            # =====================================
+            u_up = v_cme[1:].copy()
+            u_dn = v_cme[:-1].copy()
+            u_up_next = _upwind_step_(u_up, u_dn, dtdr, alpha, r_accel, rrel)
+            # Save the updated time step
+            v_cme[1:] = u_up_next.copy()
+
+            u_up = v_amb[1:].copy()
+            u_dn = v_amb[:-1].copy()
+            u_up_next = _upwind_step_(u_up, u_dn, dtdr, alpha, r_accel, rrel)
+            # Save the updated time step
+            v_amb[1:] = u_up_next.copy()
+
+        # Save any output frames up to this iteration, interpolating those that fall after the previous iteration.
+        while (t_out <= nt_out - 1) and (out_index[t_out] <= t):
+            weight = out_index[t_out] - (t - 1)
+            if weight >= 1.0:
+                v_grid_amb[t_out, :] = v_amb.copy()
+                v_grid_cme[t_out, :] = v_cme.copy()
+            else:
+                v_grid_amb[t_out, :] = (1.0 - weight) * v_amb_prev + weight * v_amb
+                v_grid_cme[t_out, :] = (1.0 - weight) * v_cme_prev + weight * v_cme
+            t_out = t_out + 1
+
+        if (t_out <= nt_out - 1) and (out_index[t_out] < t + 1):
+            v_amb_prev[:] = v_amb
+            v_cme_prev[:] = v_cme
 
     return v_grid_amb, v_grid_cme
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def _upwind_step_(v_up, v_dn, dtdr, alpha, r_accel, rrel):
     """
     Compute the next step in the upwind scheme of Burgers equation with added acceleration of the solar wind.
     :param v_up: A numpy array of the upwind radial values. Units of km/s.
     :param v_dn: A numpy array of the downwind radial values. Units of km/s.
-    :param dtdr: Ratio of HUXts time step and radial grid step. Units of s/km.
+    :param dtdr: A numpy array of the ratio of HUXts time step and the radial grid step of each upwind value. Units of
+                 s/km.
     :param alpha: Scale parameter for residual Solar wind acceleration.
     :param r_accel: Spatial scale parameter of residual solar wind acceleration. Units of km.
     :param rrel: The model radial grid relative to the radial inner boundary coordinate. Units of km.
@@ -1255,7 +2717,102 @@ def _upwind_step_(v_up, v_dn, dtdr, alpha, r_accel, rrel):
     return v_up_next
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
+def _semi_lagrangian_step_(v, v_boundary, v_boundary_next, time, dt, xi, accel, lon, lat, r_boundary, do_cme,
+                           cme_params):
+    """
+    Compute the next step of Burgers equation with added acceleration of the solar wind, with a semi-Lagrangian
+    scheme that isn't limited by the CFL condition. The speed the solar wind would have at the inner boundary,
+    w = v / accel, is conserved along characteristics, and in the stretched radial coordinate xi, with
+    dxi/dr = 1 / accel, obeys Burgers equation. So each grid point takes w from where its characteristic departed at
+    the start of the step. Where characteristics cross, the one minimising the Hopf-Lax functional is taken, which
+    gives the shocks of the weak solution of Burgers equation, whatever the time step.
+    :param v: A numpy array of the radial profile of speed at this time step. Units of km/s.
+    :param v_boundary: The ambient inner boundary speed at this time step. Units of km/s.
+    :param v_boundary_next: The ambient inner boundary speed at the next time step. Units of km/s.
+    :param time: Model time of this time step. Units of s.
+    :param dt: The model time step. Units of s.
+    :param xi: The stretched radial coordinate of the model radial grid, relative to the inner boundary. Units of km.
+    :param accel: Residual acceleration factor at each radius, 1 + alpha * (1 - exp(-rrel / r_accel)).
+    :param lon: The longitude of this radial, in radians.
+    :param lat: The latitude of this radial, in radians.
+    :param r_boundary: Height of model inner boundary. Units of km.
+    :param do_cme: If 1, ConeCMEs in cme_params are included in the inner boundary speed.
+    :param cme_params: Array of ConeCME parameters, 1 row for each CME, as required by _cone_cme_boundary_.
+    :return: The radial profile of speed at the next time step, numpy array with units of km/s.
+    """
+    nr = v.size
+
+    # Sample the solar wind entering through the inner boundary during the step, at about the grid resolution. Wind
+    # entering at time + s, with speed w_in, was at xi = -s * w_in at the start of the step.
+    v_in_max = max(v_boundary, v_boundary_next)
+    if do_cme == 1:
+        v_in_max = max(v_in_max, cme_params[:, 4].max())
+    n_in = np.int64(dt * v_in_max / xi[1]) + 1
+
+    n = n_in + nr
+    y = np.empty(n)
+    w = np.empty(n)
+    f = np.empty(n)
+    for m in range(n_in):
+        s = dt * (n_in - m) / n_in
+        w[m] = v_boundary + (v_boundary_next - v_boundary) * s / dt
+        if (do_cme == 1) & (time + s > 0):
+            # As in solve_radial, the boundary is the maximum of the speeds given by each CME.
+            v_update_cme = np.zeros(cme_params.shape[0])
+            for j in range(cme_params.shape[0]):
+                v_update_cme[j] = _cone_cme_boundary_(r_boundary, lon, lat, time + s, w[m], cme_params[j, :])
+            w[m] = v_update_cme.max()
+        y[m] = -s * w[m]
+        f[m] = (dt - s) * w[m]
+
+    y[n_in:] = xi
+    w[n_in:] = v / accel
+
+    # Where each characteristic reaches at the end of the step, and the integral of w along the initial profile.
+    f[n_in:] = y[n_in:] + dt * w[n_in:]
+    w_int = np.zeros(n)
+    for k in range(1, n):
+        w_int[k] = w_int[k - 1] + 0.5 * (w[k] + w[k - 1]) * (y[k] - y[k - 1])
+
+    # Running maximum and minimum of f, which bound the segments of the profile each grid point can be reached from.
+    f_max = f.copy()
+    for k in range(1, n):
+        f_max[k] = max(f_max[k - 1], f[k])
+    f_min = f.copy()
+    for k in range(n - 2, -1, -1):
+        f_min[k] = min(f_min[k + 1], f[k])
+
+    v_next = np.empty(nr)
+    k_lo = 0
+    k_hi = 0
+    for i in range(nr):
+        while f_max[k_lo + 1] < xi[i]:
+            k_lo = k_lo + 1
+        while (k_hi < n - 2) and (f_min[k_hi + 1] <= xi[i]):
+            k_hi = k_hi + 1
+
+        # Find the characteristics reaching xi[i] from each segment, and take the one with the least action.
+        action_min = np.inf
+        w_next = np.NaN
+        for k in range(k_lo, k_hi + 1):
+            if (min(f[k], f[k + 1]) <= xi[i]) & (xi[i] <= max(f[k], f[k + 1])):
+                theta = 0.0
+                if f[k + 1] != f[k]:
+                    theta = (xi[i] - f[k]) / (f[k + 1] - f[k])
+                y_depart = y[k] + theta * (y[k + 1] - y[k])
+                w_depart = w[k] + theta * (w[k + 1] - w[k])
+                action = w_int[k] + 0.5 * (w[k] + w_depart) * (y_depart - y[k]) + (xi[i] - y_depart) ** 2 / (2 * dt)
+                if action < action_min:
+                    action_min = action
+                    w_next = w_depart
+
+        v_next[i] = w_next * accel[i]
+
+    return v_next
+
+
+@jit(nopython=True, cache=True)
 def _cone_cme_boundary_(r_boundary, lon, lat, time, v_boundary, cme_params):
     """
     Update inner speed boundary condition with the time dependent cone cme speed, for HUXt1D.
@@ -1316,52 +2873,258 @@ def _cone_cme_boundary_(r_boundary, lon, lat, time, v_boundary, cme_params):
 
     return v_boundary
 
-def load_HUXt_run(filepath):
+
+@functools.lru_cache(maxsize=16)
+def _spin_up_state_(vinput, model_time, rrel, dtdr, lon, params):
+    """
+    Integrate the ambient solar wind through the spin up period, from 400 km/s everywhere. Cached, so runs with the
+    same spin up reuse the state rather than integrating it again. The arrays are passed as bytes, so they can be
+    hashed, and the returned array is read-only, as it is shared between callers.
+    :param vinput: Bytes of the array of inner boundary speeds of each radial through the spin up, and at the first
+                   iteration after it, of shape (n_lon, n_buffer + 1).
+    :param model_time: Bytes of the array of the model times of the spin up.
+    :param rrel: Bytes of the array of model radial coordinates relative to inner boundary coordinate.
+    :param dtdr: Bytes of the array of the ratio of the model time step to the radial step of each grid cell.
+    :param lon: Bytes of the array of the longitude of each radial.
+    :param params: Tuple of the HUXt parameters, as for solve_radial.
+    :return v_init: Array of the solar wind speed at the end of the spin up of each radial, of shape (n_lon, nr).
+    """
+    lon = np.frombuffer(lon)
+    rrel = np.frombuffer(rrel)
+    model_time = np.frombuffer(model_time)
+    vinput = np.frombuffer(vinput).reshape((lon.size, -1))
+    v_init = np.full((lon.size, rrel.size), huxt_constants()['v_init'].value)
+    out_index = np.array([model_time.size - 1.0])
+    cme_params = np.NaN * np.zeros((1, 8))
+    v_amb = np.empty((1, rrel.size, lon.size))
+    v_cme = np.empty((1, rrel.size, lon.size))
+    solve_radials(vinput, model_time, rrel, np.frombuffer(dtdr), lon, 0.0, np.array(params), 0, cme_params, v_init,
+                  out_index, v_amb, v_cme)
+    v_init = np.ascontiguousarray(v_amb[0, :, :].T)
+    v_init.flags.writeable = False
+    return v_init
+
+
+def warmup():
+    """
+    Compile the numba solvers for their explicit signatures, or load them from the on-disk cache if an earlier process
+    compiled them. This is done on the first solve, but can be called ahead of time, e.g. in the initialiser of a pool
+    of workers, so that the first solve isn't delayed by compilation. Does nothing if numba JIT compilation is
+    disabled, e.g. with NUMBA_DISABLE_JIT=1, as the solvers are then plain python functions.
+
+    Compiling other specialisations is then disabled, so the solvers only accept arguments of their explicit
+    signatures: float64 arrays and scalars, with float64 or float32 output storage for solve_radials. As HUXt.solve
+    calls warmup, calling solve_radial or solve_radials directly with other dtypes, such as float32 or integer
+    inputs, raises a TypeError. Convert such arguments to float64 first.
+    """
+    if numba.config.DISABLE_JIT:
+        return
+
+    solvers = [(_upwind_step_, [_upwind_step_signature_]), (_cone_cme_boundary_, [_cone_cme_boundary_signature_]),
+               (_semi_lagrangian_step_, [_semi_lagrangian_step_signature_]),
+               (solve_radial, [_solve_radial_signature_]), (solve_radials, _solve_radials_signatures_)]
+    for solver, signatures in solvers:
+        if hasattr(solver, 'signatures') and (len(solver.signatures) == 0):
+            for signature in signatures:
+                solver.compile(signature)
+            # Stop numba compiling other specialisations, so all calls use the cached signature.
+            solver.disable_compile()
+    return
+
+
+def _cme_crossing_time_(r_boundary, lon, lat, cme_params):
+    """
+    Find when the front of each ConeCME first crosses the inner boundary along a set of radials. This uses the same
+    cone geometry as _cone_cme_boundary_, solved for the time the cone first intersects each radial.
+    :param r_boundary: Height of model inner boundary, in km.
+    :param lon: Array of longitudes of the radials, in radians.
+    :param lat: Array of latitudes of the radials, in radians.
+    :param cme_params: Array of ConeCME parameters, of shape (n_cme, 8), as given by ConeCME.parameter_array.
+    :return: Array of shape (n_cme, lon.size) of the crossing times, in seconds. NaN where a CME misses a radial.
+    """
+    lon_cent = lon[np.newaxis, :] - cme_params[:, 1:2]
+    lon_cent = np.arctan2(np.sin(lon_cent), np.cos(lon_cent))
+    lat_cent = lat[np.newaxis, :] - cme_params[:, 2:3]
+    sigma = np.arccos(np.cos(lat_cent) * np.cos(lon_cent))
+    cme_radius = cme_params[:, 6:7]
+    theta = np.arctan(cme_radius / r_boundary)
+    crosses = (np.abs(lon_cent) <= cme_params[:, 3:4] / 2) & (sigma <= theta)
+
+    # Height of the CME nose above the boundary when the front hemisphere first reaches the radial.
+    x = r_boundary * np.tan(np.minimum(sigma, theta))
+    y = cme_radius - np.sqrt(np.maximum(cme_radius ** 2 - x ** 2, 0))
+    t_cross = cme_params[:, 0:1] + y / cme_params[:, 4:5]
+    t_cross[~crosses] = np.NaN
+    return t_cross
+
+
+def _nearest_radial_index_(r, pos):
+    """
+    Find the indices of the radial grid points closest to a set of radii.
+    :param r: Array of the model radial grid.
+    :param pos: Array of radii, in the same units as r.
+    :return: Integer array of indices into r, of the same shape as pos.
+    """
+    id_r = np.clip(np.searchsorted(r, pos), 1, r.size - 1)
+    id_r -= (pos - r[id_r - 1]) < (r[id_r] - pos)
+    return id_r
+
+
+def _radial_speed_(v, r, pos):
+    """
+    Linearly interpolate the flow speed along each of a set of radials to a set of radii.
+    :param v: Array of flow speeds of shape (nr, n), along n radials.
+    :param r: Array of the model radial grid, of size nr.
+    :param pos: Array of shape (m, n) of radii on each radial, in the same units as r. Clipped to the grid.
+    :return: Array of shape (m, n) of flow speeds.
+    """
+    id_r = np.clip(np.searchsorted(r, pos) - 1, 0, r.size - 2)
+    w = np.clip((pos - r[id_r]) / (r[id_r + 1] - r[id_r]), 0, 1)
+    col = np.arange(v.shape[1])
+    return (1 - w) * v[id_r, col] + w * v[id_r + 1, col]
+
+
+def _trace_cme_fronts_(v_cme, cme_bool, r, time_out, t_cross):
     """
-    Load in data from a saved HUXt run.
+    Trace the front of each ConeCME outwards along a set of radials, by following the flow speed of the CME solution
+    from the time each CME crosses the inner boundary. The speed is interpolated in radius, and linearly in time
+    between output times, so fronts that cross the boundary between output times, or move several cells per output
+    step, are followed. A front that steepens into a shock is carried along with it.
+    :param v_cme: Array of the CME solution along the radials, of shape (nt_out, nr, n), in km/s.
+    :param cme_bool: Boolean array of shape (nt_out, nr, n), True where the flow is CME flow.
+    :param r: Array of the model radial grid, in km.
+    :param time_out: Array of model output times, in seconds.
+    :param t_cross: Array of shape (n_cme, n) of the time each CME crosses the inner boundary of each radial.
+    :return: Array of shape (nt_out, n_cme, n) of the radius of each CME front at each output time, in km. NaN
+             before a CME crosses the boundary, or for radials it misses.
+    """
+    nt = time_out.size
+    col = np.arange(t_cross.shape[1])
+    dr_min = np.diff(r).min()
+    front = np.zeros((nt,) + t_cross.shape) * np.NaN
+    pos = np.zeros(t_cross.shape) * np.NaN
+
+    for k in range(nt):
+        if k == 0:
+            # The CME solution is only known from the first output, so CMEs that crossed the boundary earlier are
+            # moved through the first output, stopping at the outer edge of the CME flow they are in.
+            t_a = np.nanmin(np.append(t_cross, time_out[0]))
+            v_a = v_cme[0]
+        else:
+            t_a = time_out[k - 1]
+            v_a = v_cme[k - 1]
+
+        t_b = time_out[k]
+        v_b = v_cme[k]
+        if t_b > t_a:
+            # Substeps short enough that no front moves more than one radial cell in each.
+            n_sub = np.int64(np.ceil(max(v_a.max(), v_b.max()) * (t_b - t_a) / dr_min))
+            t_sub = np.linspace(t_a, t_b, n_sub + 1)
+            for j in range(n_sub):
+                start = np.isnan(pos) & (t_cross <= t_sub[j + 1])
+                pos[start] = r[0]
+                moving = ~np.isnan(pos)
+                if not np.any(moving):
+                    continue
+
+                f = (t_sub[j] - t_a) / (t_b - t_a)
+                v = (1 - f) * _radial_speed_(v_a, r, pos) + f * _radial_speed_(v_b, r, pos)
+                step = v * (t_sub[j + 1] - np.fmax(t_sub[j], t_cross))
+                pos_next = np.where(moving, pos + step, pos)
+                if k == 0:
+                    in_cme = cme_bool[0][_nearest_radial_index_(r, np.where(moving, pos, r[0])), col]
+                    in_cme_next = cme_bool[0][_nearest_radial_index_(r, np.where(moving, pos_next, r[0])), col]
+                    pos_next = np.where(in_cme & ~in_cme_next, pos, pos_next)
+
+                pos = pos_next
+
+        front[k] = pos
+
+    return front
+
+
+def _cme_flow_owner_(v_cme, v_amb, r, time_out, lon, lat, cme_params):
+    """
+    Attribute the CME flow along a set of radials to the ConeCMEs that drive it. The front of each CME is traced from
+    the time it crosses the inner boundary, and each continuous radial run of CME flow is split between the CMEs whose
+    fronts lie in it. Each CME takes the flow from its front back to the front of the next CME, and the leading CME
+    also takes the flow ahead of its front. So CMEs whose flow merges into one run are still told apart, until their
+    fronts merge into one shock, which then carries the flow of both. Runs of CME flow without a CME front in them,
+    such as the trailing part of a CME that has split in two, are not attributed.
+    :param v_cme: Array of the CME solution along the radials, of shape (nt_out, nr, n), in km/s.
+    :param v_amb: Array of the ambient solution along the radials, of shape (nt_out, nr, n), in km/s.
+    :param r: Array of the model radial grid, in km.
+    :param time_out: Array of model output times, in seconds.
+    :param lon: Array of the n longitudes of the radials, in radians.
+    :param lat: Array of the n latitudes of the radials, in radians.
+    :param cme_params: Array of ConeCME parameters, of shape (n_cme, 8), as given by ConeCME.parameter_array.
+    :return: Boolean array of shape (n_cme, nt_out, nr, n), True where the flow belongs to each CME.
+    """
+    nt, nr, n = v_cme.shape
+    n_cme = cme_params.shape[0]
+
+    # Owens definition of CME in HUXt:
+    cme_bool = (v_cme - v_amb) >= 20
+
+    # Number each continuous radial run of CME flow from the inner boundary outwards, with 0 outside CME flow.
+    pad = np.zeros((nt, 1, n), dtype=bool)
+    inner_edge = cme_bool & ~np.concatenate((pad, cme_bool[:, :-1, :]), axis=1)
+    run_num = np.where(cme_bool, np.cumsum(inner_edge, axis=1), 0)
+
+    t_cross = _cme_crossing_time_(r[0], lon, lat, cme_params)
+    front = _trace_cme_fronts_(v_cme, cme_bool, r, time_out, t_cross)
+    traced = ~np.isnan(front)
+    id_front = _nearest_radial_index_(r, np.where(traced, front, r[0]))
+
+    # Find the run each front is in. A front can lie just ahead of the cells flagged as CME flow, at the foot of the
+    # shock, so also look a couple of cells behind it. Fronts this close together have merged into one shock.
+    n_merge = 2
+    id_t = np.arange(nt).reshape((nt, 1, 1))
+    col = np.arange(n)
+    run_front = np.zeros(front.shape, dtype=np.int64)
+    for offset in range(0, -n_merge - 1, -1):
+        id_near = np.clip(id_front + offset, 0, nr - 1)
+        run_front = np.where(run_front > 0, run_front, run_num[id_t, id_near, col])
+    run_front[~traced] = 0
+
+    id_r = np.arange(nr).reshape((1, nr, 1))
+    owner = np.zeros((n_cme, nt, nr, n), dtype=bool)
+    for c in range(n_cme):
+        # Radial indices bounding the flow of this CME, from the fronts of the other CMEs in the same run.
+        upper = np.full((nt, n), nr - 1)
+        lower = np.full((nt, n), -1)
+        for c2 in range(n_cme):
+            if c2 == c:
+                continue
+            same = (run_front[:, c2, :] == run_front[:, c, :]) & (run_front[:, c, :] > 0)
+            ahead = same & (id_front[:, c2, :] > id_front[:, c, :] + n_merge)
+            behind = same & (id_front[:, c2, :] < id_front[:, c, :] - n_merge)
+            upper = np.where(ahead, id_front[:, c, :], upper)
+            lower = np.where(behind, np.maximum(lower, id_front[:, c2, :]), lower)
+
+        run_c = run_front[:, c, np.newaxis, :]
+        owner[c] = ((run_num == run_c) & (run_c > 0) & (id_r <= upper[:, np.newaxis, :])
+                    & (id_r > lower[:, np.newaxis, :]))
+
+    return owner
+
+
+def load_HUXt_run(filepath, lazy=False):
+    """
+    Load in data from a saved HUXt run. The model state is restored directly from the file, without reloading the
+    boundary conditions or recomputing the model grids.
 
     :param filepath: The full path to a HDF5 file containing the output from HUXt.save()
+    :param lazy: Boolean, if True the solar wind speed fields are not read into memory. Instead the file is kept open
+                 and model.v_grid_cme and model.v_grid_amb are LazyQuantity instances, which only read the data that
+                 is sliced. The model should then be closed with model.close(), or used as a context manager.
     :return: cme_list: A list of instances of ConeCME
     :return: model: An instance of HUXt containing loaded results.
     """
     if os.path.isfile(filepath):
 
         data = h5py.File(filepath, 'r')
-
-        cr_num = np.int32(data['cr_num'])
-        cr_lon_init = data['cr_lon_init'][()] * u.Unit(data['cr_lon_init'].attrs['unit'])
-        simtime = data['simtime'][()] * u.Unit(data['simtime'].attrs['unit'])
-        simtime = simtime.to(u.day)
-        dt_scale = data['dt_scale'][()]
-        v_boundary = data['_v_boundary_init_'][()] * u.Unit(data['_v_boundary_init_'].attrs['unit'])
-        r = data['r'][()] * u.Unit(data['r'].attrs['unit'])
-        lon = data['lon'][()] * u.Unit(data['lon'].attrs['unit'])
-        nlon = lon.size
-        map_inwards = np.int32(data['_map_inwards_'])
-        if map_inwards == 1:
-            map_inwards = True
-        else:
-            map_inwards = False
-
-        if cr_num != 9999:
-            if nlon == 1:
-                model = HUXt(cr_num=cr_num, cr_lon_init=cr_lon_init, r_min=r.min(), r_max=r.max(),
-                             lon_out=lon, simtime=simtime, dt_scale=dt_scale, map_inwards=map_inwards)
-            elif nlon > 1:
-                model = HUXt(cr_num=cr_num, cr_lon_init=cr_lon_init, r_min=r.min(), r_max=r.max(),
-                             lon_start=lon.min(), lon_stop=lon.max(), simtime=simtime, dt_scale=dt_scale,
-                             map_inwards=map_inwards)
-        else:
-            if nlon == 1:
-                model = HUXt(v_boundary=v_boundary, cr_lon_init=cr_lon_init, r_min=r.min(), r_max=r.max(),
-                             lon_out=lon, simtime=simtime, dt_scale=dt_scale, map_inwards=map_inwards)
-            elif nlon > 1:
-                model = HUXt(v_boundary=v_boundary, cr_lon_init=cr_lon_init, r_min=r.min(), r_max=r.max(),
-                             lon_start=lon.min(), lon_stop=lon.max(), simtime=simtime, dt_scale=dt_scale,
-                             map_inwards=map_inwards)
-
-        model.v_grid_cme[:, :, :] = data['v_grid_cme'][()] * u.Unit(data['v_boundary'].attrs['unit'])
-        model.v_grid_amb[:, :, :] = data['v_grid_amb'][()] * u.Unit(data['v_boundary'].attrs['unit'])
+        model = _restore_HUXt_(data, lazy)
 
         # Create list of the ConeCMEs
         cme_list = []
@@ -1384,19 +3147,30 @@ def load_HUXt_run(filepath):
                                'lon': np.array([]) * model.lon.unit, 'r': np.array([]) * model.r.unit}
                            for j in range(len(coords_group))}
 
+            # Each coordinate has the same units at every time, so only parse the units once.
+            pos_units = {}
             for time_key, pos in coords_group.items():
-                t = np.int(time_key.split("_")[2])
-                coords_data[t]['lon_pix'] = pos['lon_pix'][()] * u.Unit(pos['lon_pix'].attrs['unit'])
-                coords_data[t]['r_pix'] = pos['r_pix'][()] * u.Unit(pos['r_pix'].attrs['unit'])
-                coords_data[t]['lon'] = pos['lon'][()] * u.Unit(pos['lon'].attrs['unit'])
-                coords_data[t]['r'] = pos['r'][()] * u.Unit(pos['r'].attrs['unit'])
+                t = np.int32(time_key.split("_")[2])
+                for pos_label in ['lon_pix', 'r_pix', 'lon', 'r']:
+                    if pos_label not in pos_units:
+                        pos_units[pos_label] = u.Unit(pos[pos_label].attrs['unit'])
+                    coords_data[t][pos_label] = u.Quantity(pos[pos_label][()], pos_units[pos_label], copy=False)
 
             cme.coords = coords_data
+
+            # Envelopes are only saved if they were tracked.
+            if 'envelope' in cme_data.keys():
+                for env_label, env_data in cme_data['envelope'].items():
+                    cme.envelope[env_label] = env_data[()] * u.Unit(env_data.attrs['unit'])
+
             cme_list.append(cme)
 
         # Update CMEs in model output
         model.cmes = cme_list
 
+        if not lazy:
+            data.close()
+
     else:
         # File doesnt exist return nothing
         print("Warning: {} doesnt exist.".format(filepath))
@@ -1406,10 +3180,222 @@ def load_HUXt_run(filepath):
     return model, cme_list
 
 
-@u.quantity_input(v_outer=u.km / u.s)
-@u.quantity_input(r_outer=u.solRad)
-@u.quantity_input(lon_outer=u.rad)
-@u.quantity_input(r_inner=u.solRad)
+def _restore_HUXt_(data, lazy):
+    """
+    Create a HUXt instance from the contents of a file saved by HUXt.save(). This sets the model attributes directly,
+    rather than calling HUXt.__init__, which would reload the boundary conditions, recompute the grids and
+    preallocate output arrays that are immediately overwritten. So the attributes set here must be kept in step with
+    those set by HUXt.__init__, which test_restore_attributes checks.
+    :param data: An open h5py File containing the output from HUXt.save()
+    :param lazy: Boolean, if True the solar wind speed fields are LazyQuantity views of the file.
+    :return: model: An instance of HUXt containing loaded results.
+    """
+    def load(key):
+        return u.Quantity(data[key][()], data[key].attrs['unit'], copy=False)
+
+    model = HUXt.__new__(HUXt)
+
+    # some constants and units
+    constants = huxt_constants()
+    model.twopi = constants['twopi']
+    model.daysec = constants['daysec']
+    model.kms = constants['kms']
+    model.synodic_period = constants['synodic_period']
+    model.alpha = load('alpha')
+    model.r_accel = load('r_accel')
+    model.v_max = load('v_max')
+    del constants
+
+    dirs = _setup_dirs_()
+    model._boundary_dir_ = dirs['boundary_conditions']
+    model._data_dir_ = dirs['HUXt_data']
+    model._figure_dir_ = dirs['HUXt_figures']
+    model._ephemeris_file = dirs['ephemeris']
+
+    # Spatial coordinates
+    model.r = load('r')
+    model.dr = load('dr')
+    if 'dr_stretch' in data:
+        model.dr_stretch = load('dr_stretch')
+    else:
+        # Files saved before stretched radial grids were available.
+        model.dr_stretch = 1.0 * u.dimensionless_unscaled
+    model.rrel = model.r - model.r[0]
+    model.nr = model.r.size
+    model.buffertime = ((5.0 * u.day) / (210 * u.solRad)) * model.rrel[-1]
+    model.lon = load('lon')
+    model.dlon = load('dlon')
+    model.nlon = model.lon.size
+    model.nlon_full = np.int32(np.rint(model.twopi / model.dlon.value))
+    if 'lat' in data:
+        model.lat = load('lat')
+    else:
+        # Files saved before multiple latitudes were available.
+        model.lat = np.zeros(1) * u.rad
+    model.nlat = model.lat.size
+    model.r_grid = load('r_grid')
+    model.lon_grid = load('lon_grid')
+
+    # Time coordinates
+    model.scheme = data.attrs.get('scheme', 'upwind')
+    model.simtime = load('simtime')
+    model.dt_scale = load('dt_scale')
+    model.dt = load('dt')
+    model.dtdr = model.dt / model.dr.to('km')
+    model.Nt = np.int32(np.floor(model.simtime.to(model.dt.unit) / model.dt))
+    model.time = np.arange(0, model.Nt) * model.dt
+    model.time_out = load('time_out')
+    model.dt_out = load('dt_out')
+    model.nt_out = model.time_out.size
+
+    # Boundary conditions
+    model.cr_num = load('cr_num')
+    model.cr_lon_init = load('cr_lon_init')
+    model.v_boundary = load('v_boundary')
+    model._v_boundary_init_ = load('_v_boundary_init_')
+    model._map_inwards_ = load('_map_inwards_')
+    if '_adaptive_dt_' in data:
+        model._adaptive_dt_ = load('_adaptive_dt_')
+    else:
+        # Files saved before adaptive time steps were available.
+        model._adaptive_dt_ = 0.0 * u.dimensionless_unscaled
+    if 'time_init' in data:
+        jd1, jd2 = data['time_init'][()]
+        model.time_init = Time(jd1, jd2, format=data['time_init'].attrs['format'])
+    elif model.cr_num.value != 9999:
+        # Files saved before time_init was stored.
+        cr_frac = model.cr_num.value + ((model.twopi - model.cr_lon_init.value) / model.twopi)
+        model.time_init = _carrington_rotation_time_(float(cr_frac)).copy()
+    else:
+        model.time_init = np.NaN
+
+    if lazy:
+        model.v_grid_cme = LazyQuantity(data['v_grid_cme'], data['v_grid_cme'].attrs['unit'])
+        model.v_grid_amb = LazyQuantity(data['v_grid_amb'], data['v_grid_amb'].attrs['unit'])
+        model._file_ = data
+    else:
+        model.v_grid_cme = load('v_grid_cme')
+        model.v_grid_amb = load('v_grid_amb')
+        model._file_ = None
+
+    model.dtype = data['v_grid_cme'].dtype
+
+    model.cmes = []
+    model._update_model_params_()
+    return model
+
+
+class LazyQuantity:
+    """
+    A read-only, array-like view of a HDF5 dataset with units, which only reads data from the file when it is sliced.
+    Slicing returns an astropy Quantity, so model.v_grid_cme[:, id_r, id_lon] reads only that timeseries from disk.
+    Accessing LazyQuantity.value reads the whole dataset.
+    Attributes:
+        dataset: The h5py Dataset containing the data.
+        unit: The astropy.unit of the data.
+        shape: Shape of the dataset.
+        ndim: Number of dimensions of the dataset.
+        size: Number of elements in the dataset.
+        dtype: Data type of the dataset.
+    """
+
+    def __init__(self, dataset, unit):
+        """
+        :param dataset: An open h5py Dataset.
+        :param unit: The astropy.unit, or unit string, of the data.
+        """
+        self.dataset = dataset
+        self.unit = u.Unit(unit)
+        self.shape = dataset.shape
+        self.ndim = dataset.ndim
+        self.size = dataset.size
+        self.dtype = dataset.dtype
+        return
+
+    def __getitem__(self, key):
+        """
+        Read a selection of the dataset from the file, with numpy indexing rules.
+        :param key: Any combination of integers, slices, Ellipsis and integer arrays.
+        :return: Astropy Quantity of the selected data.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        # Expand any Ellipsis, so that each index is matched to its axis.
+        for i, k in enumerate(key):
+            if k is Ellipsis:
+                key = key[:i] + (slice(None),) * (self.ndim - len(key) + 1) + key[i + 1:]
+                break
+
+        # h5py only supports simple selections, so read the bounding box of any index arrays, and then index
+        # within the bounding box with numpy. With index arrays, integer indices are also applied by numpy, so that
+        # the axes of the result are in the same order as numpy advanced indexing would give.
+        has_array = any(not isinstance(k, (slice, int, np.integer)) for k in key)
+        read_key = []
+        post_key = []
+        for axis, k in enumerate(key):
+            if isinstance(k, slice):
+                read_key.append(k)
+                post_key.append(slice(None))
+            elif isinstance(k, (int, np.integer)):
+                if has_array:
+                    k = self._normalise_index_(k, axis)
+                    read_key.append(slice(k, k + 1))
+                    post_key.append(0)
+                else:
+                    read_key.append(k)
+            else:
+                k = np.asarray(k)
+                if k.dtype == bool:
+                    k = np.flatnonzero(k)
+                elif k.size == 0:
+                    k = k.astype(np.intp)
+                k = self._normalise_index_(k, axis)
+                k_min = k.min() if k.size > 0 else 0
+                k_max = k.max() if k.size > 0 else -1
+                read_key.append(slice(k_min, k_max + 1))
+                post_key.append(k - k_min)
+
+        data = self.dataset[tuple(read_key)]
+        if has_array:
+            data = data[tuple(post_key)]
+
+        return data * self.unit
+
+    def _normalise_index_(self, index, axis):
+        """
+        Check integer indices are within the bounds of an axis, and convert negative indices to positive ones.
+        :param index: Integer, or array of integers, indexing the axis.
+        :param axis: The axis of the dataset that is indexed.
+        :return: The index, with negative indices counted from the end of the axis.
+        """
+        n = self.shape[axis]
+        if np.any((index < -n) | (index >= n)):
+            raise IndexError("index out of bounds for axis {} with size {}".format(axis, n))
+        return index % n
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.dataset[()], dtype=dtype)
+
+    @property
+    def value(self):
+        """
+        Read the whole dataset into memory, without units.
+        """
+        return self.dataset[()]
+
+    def to(self, unit):
+        """
+        Read the whole dataset into memory, and convert to the specified units.
+        :param unit: The astropy.unit to convert to.
+        """
+        return (self.dataset[()] * self.unit).to(unit)
+
+
+@u.quantity_input(v_outer=u.km / u.s, r_outer=u.solRad, lon_outer=u.rad, r_inner=u.solRad)
 def map_v_inwards(v_outer, r_outer, lon_outer, r_inner):
     """
     Function to map v from r_outer (in rs) to r_inner (in rs)
@@ -1426,7 +3412,7 @@ def map_v_inwards(v_outer, r_outer, lon_outer, r_inner):
 
     # get the acceleration parameters
     constants = huxt_constants()
-    alpha = constants['alpha']  # Scale parameter for residual SW acceleration
+    alpha = constants['alpha'].value  # Scale parameter for residual SW acceleration
     rH = constants['r_accel'].to(u.kilometer).value  # Spatial scale parameter for residual SW acceleration
     Tsyn = constants['synodic_period'].to(u.s).value
     r_outer = r_outer.to(u.km).value
@@ -1449,13 +3435,38 @@ def map_v_inwards(v_outer, r_outer, lon_outer, r_inner):
     return v0*u.km/u.s, phi_new*u.rad
 
 
-@u.quantity_input(v_outer=u.km / u.s)
-@u.quantity_input(r_outer=u.solRad)
-@u.quantity_input(r_inner=u.solRad)
+@u.quantity_input(v_boundary=u.km / u.s)
+def resample_boundary(v_boundary, nlon):
+    """
+    Resample a longitudinal solar wind speed boundary condition onto a longitude grid of a different resolution.
+    Coarser grids take the mean speed over each longitude bin, and finer grids are linearly interpolated, with the
+    boundary treated as periodic in both cases.
+    :param v_boundary: Solar wind speed boundary condition, on longitudes evenly spaced from 0 to 2pi. Units of km/s.
+    :param nlon: Number of longitudes to resample the boundary condition to.
+    :return v_resampled: Solar wind speed boundary condition on the nlon longitude grid. Units of km/s.
+    """
+    lon_in, dlon_in, nlon_in = longitude_grid(nlon=v_boundary.size)
+    lon_out, dlon_out, nlon_out = longitude_grid(nlon=nlon)
+    v_in = v_boundary.to_value(u.km / u.s)
+
+    if nlon_out >= nlon_in:
+        v_out = np.interp(lon_out.value, lon_in.value, v_in, period=2 * np.pi)
+    else:
+        # Integrate the speed over longitude from 0, and difference this at the edges of the new longitude bins.
+        v_int = np.append(0, np.cumsum(v_in) * dlon_in.value)
+        edges_in = np.arange(nlon_in + 1) * dlon_in.value
+        edges_out = np.arange(nlon_out + 1) * dlon_out.value
+        v_out = np.diff(np.interp(edges_out, edges_in, v_int)) / dlon_out.value
+
+    return v_out * (u.km / u.s)
+
+
+@u.quantity_input(v_outer=u.km / u.s, r_outer=u.solRad, r_inner=u.solRad)
 def map_v_boundary_inwards(v_outer, r_outer, r_inner):
     """
     Function to map a longitudinal V series from r_outer (in rs) to r_inner (in rs)
-    :param v_outer: Solar wind speed at outer radial boundary. Units of km/s.
+    :param v_outer: Solar wind speed at outer radial boundary. Units of km/s. This can also be an array of shape
+                    (n_boundary, nlon) of many boundaries, which are mapped together.
     :param r_outer: Radial distance at outer radial boundary. Units of km.
     :param r_inner: Radial distance at inner radial boundary. Units of km.
     :return v_inner: Solar wind speed mapped from r_outer to r_inner. Units of km/s.
@@ -1465,12 +3476,57 @@ def map_v_boundary_inwards(v_outer, r_outer, r_inner):
         raise ValueError("Warning: r_outer < r_inner. Mapping will not work.")
 
     # compute the longitude grid from the length of the vouter input variable
-    lon, dlon, nlon = longitude_grid()   
+    lon, dlon, nlon = longitude_grid(nlon=v_outer.shape[-1])
     #map each point in to a new speed and longitude
     v0, phis_new = map_v_inwards(v_outer, r_outer, lon, r_inner)
 
     #interpolate the mapped speeds back onto the regular Carr long grid,
     #making boundaries periodic 
-    v_inner = np.interp(lon, phis_new, v0, period=2*np.pi) 
+    if v_outer.ndim == 1:
+        v_inner = np.interp(lon, phis_new, v0, period=2*np.pi)
+    else:
+        v_inner = np.array([np.interp(lon.value, phi, v, period=2 * np.pi)
+                            for phi, v in zip(phis_new.value, v0.value)]) * v0.unit
+
+    return v_inner
+
 
-    return v_inner
\ No newline at end of file
+@functools.lru_cache(maxsize=256)
+def _preprocess_boundary_(v_boundary, nlon_in, nlon, r_inner, cr_lon_init, map_inwards):
+    """
+    Resample boundary conditions to the model longitude grid, map them inwards from 30 solar radii if needed, and
+    rotate them as required by cr_lon_init. Cached, so models built from the same boundary conditions share the
+    result. The boundary conditions are passed as bytes, so they can be hashed, and the returned arrays are read-only.
+    :param v_boundary: Bytes of the array of boundary conditions, of shape (n_boundary, nlon_in). Units of km/s.
+    :param nlon_in: Number of longitudes of the boundary conditions.
+    :param nlon: Number of longitudes of the model longitude grid.
+    :param r_inner: Radius of the model inner boundary, in solar radii.
+    :param cr_lon_init: Carrington longitude of Earth at model initialisation, in radians.
+    :param map_inwards: Boolean, if True the boundary conditions are mapped inwards from 30 solar radii to r_inner.
+    :return v_resampled: Array of the resampled boundary conditions, of shape (n_boundary, nlon). Units of km/s.
+    :return v_processed: Array of the mapped and rotated boundary conditions, of shape (n_boundary, nlon). Units of
+                         km/s.
+    """
+    kms = u.km / u.s
+    v_rows = np.frombuffer(v_boundary).reshape((-1, nlon_in))
+    if nlon_in != nlon:
+        v_rows = np.array([resample_boundary(v * kms, nlon).value for v in v_rows])
+
+    v_resampled = v_rows.copy()
+    if map_inwards:
+        # Assumes inner boundary was specified at 30 Rs, which is true for default Carrington maps.
+        v_rows = map_v_boundary_inwards(v_rows * kms, 30 * u.solRad, r_inner * u.solRad).value
+
+    # Rotate the boundary condition as required by cr_lon_init. The default of 2pi needs no rotation.
+    if not np.isclose(cr_lon_init, 2 * np.pi):
+        lon_boundary, dlon, nlon = longitude_grid(nlon=nlon)
+        lon_shifted = _zerototwopi_(lon_boundary.value - cr_lon_init)
+        id_sort = np.argsort(lon_shifted)
+        lon_shifted = lon_shifted[id_sort]
+        v_rows = np.array([np.interp(lon_boundary.value, lon_shifted, v[id_sort], period=2 * np.pi)
+                           for v in v_rows])
+
+    v_rows = v_rows.copy()
+    v_resampled.flags.writeable = False
+    v_rows.flags.writeable = False
+    return v_resampled, v_rows
\ No newline at end of file
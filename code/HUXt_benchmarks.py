@@ -0,0 +1,494 @@
+"""
+Benchmarks of the HUXt model. Run from the directory containing config.dat, with
+    python HUXt_benchmarks.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import numpy as np
+import astropy.units as u
+
+import HUXt as H
+
+
+def _time_per_call_(func, n_calls, n_repeat=5):
+    """
+    Time a function, taking the best of several repeats to reduce the effect of other processes.
+    :param func: Function to call with no arguments.
+    :param n_calls: Number of calls in each repeat.
+    :param n_repeat: Number of repeats.
+    :return: The best time per call, in seconds.
+    """
+    times = timeit.repeat(func, number=n_calls, repeat=n_repeat)
+    return min(times) / n_calls
+
+
+def benchmark_construction(n_calls=100, cr_num=2000):
+    """
+    Benchmark the cost of constructing HUXt and ConeCME instances, as used when building large ensembles.
+    :param n_calls: Number of instances to construct in each timing repeat.
+    :param cr_num: Carrington rotation number of the boundary condition used by the cr_num cases.
+    :return: Dictionary of the time per construction for each case, in seconds.
+    """
+    v_boundary = np.ones(128) * 400 * (u.km / u.s)
+    cases = {'v_boundary': lambda: H.HUXt(v_boundary=v_boundary, simtime=5 * u.day, dt_scale=4),
+             'cr_num': lambda: H.HUXt(cr_num=cr_num, simtime=5 * u.day, dt_scale=4),
+             'cr_num, cr_lon_init': lambda: H.HUXt(cr_num=cr_num, cr_lon_init=180 * u.deg, simtime=5 * u.day,
+                                                   dt_scale=4),
+             'single longitude': lambda: H.HUXt(cr_num=cr_num, lon_out=0 * u.deg, simtime=5 * u.day, dt_scale=4),
+             'ConeCME': lambda: H.ConeCME(t_launch=0.5 * u.day, longitude=10 * u.deg, width=30 * u.deg,
+                                          v=1000 * (u.km / u.s), thickness=5 * u.solRad)}
+
+    timings = {}
+    for label, func in cases.items():
+        # Call once before timing, so one-off costs such as reading the boundary conditions aren't included.
+        func()
+        timings[label] = _time_per_call_(func, n_calls)
+
+    return timings
+
+
+def benchmark_boundary_preprocessing(n_calls=100, n_boundary=500, cr_num=2000):
+    """
+    Benchmark constructing models in a sweep over cr_lon_init, with the inner boundary mapped inwards, with and
+    without the cache of preprocessed boundary conditions. Also benchmark mapping many boundary conditions inwards in
+    one batch, against mapping each in turn.
+    :param n_calls: Number of models to construct, each with a different cr_lon_init. The sweep is repeated, so the
+                    second pass hits the cache.
+    :param n_boundary: Number of random boundary conditions to map inwards.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :return: Dictionary of the time per call (s) of each case.
+    """
+    cr_lon_inits = np.linspace(0, 360, n_calls, endpoint=False) * u.deg
+    model_args = dict(cr_num=cr_num, r_min=10 * u.solRad, map_inwards=True)
+    timings = {}
+    # Clear the cache, so the first sweep preprocesses every boundary condition.
+    H._preprocess_boundary_.cache_clear()
+    for label in ['construct, uncached', 'construct, cached']:
+        t_start = timeit.default_timer()
+        for cr_lon_init in cr_lon_inits:
+            H.HUXt(cr_lon_init=cr_lon_init, **model_args)
+        timings[label] = (timeit.default_timer() - t_start) / n_calls
+
+    rng = np.random.default_rng(0)
+    v_outer = (300 + 400 * rng.random((n_boundary, 128))) * (u.km / u.s)
+    timings['map inwards, loop'] = _time_per_call_(
+        lambda: [H.map_v_boundary_inwards(v, 30 * u.solRad, 10 * u.solRad) for v in v_outer], 1, 3) / n_boundary
+    timings['map inwards, batched'] = _time_per_call_(
+        lambda: H.map_v_boundary_inwards(v_outer, 30 * u.solRad, 10 * u.solRad), 1, 3) / n_boundary
+    return timings
+
+
+def benchmark_output_memory(simtime=5 * u.day, dt_scale=4, cr_num=2000):
+    """
+    Benchmark the memory used by HUXt instances, before and after solving, for each output storage dtype.
+    :param simtime: Simulation time of the models.
+    :param dt_scale: Output time step scaling of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :return: Dictionary of the peak memory allocated in constructing each model, and the memory of its output fields
+             once solved, in bytes.
+    """
+    memory = {}
+    for dtype in [np.float64, np.float32]:
+        # Construct once before tracing, so cached boundary conditions and grids aren't counted.
+        H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale, dtype=dtype)
+        tracemalloc.start()
+        model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale, dtype=dtype)
+        construct = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        model.solve([])
+        output = model.v_grid_cme.nbytes + model.v_grid_amb.nbytes
+        memory[np.dtype(dtype).name] = {'construct': construct, 'output': output}
+
+    return memory
+
+
+def benchmark_adaptive_dt(simtime=5 * u.day, dt_scale=4, cr_num=2000, n_repeat=3):
+    """
+    Benchmark solving with the adaptive time step against the fixed v_max time step, for an ambient only run and a run
+    with a ConeCME. The adaptive solutions are compared with the fixed time step solutions on the output grid.
+    :param simtime: Simulation time of the models.
+    :param dt_scale: Output time step scaling of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the model time step, number of time steps and solve time (s) for each case and time step
+             mode, and the mean and maximum absolute difference (km/s) of the adaptive solution from the fixed one.
+    """
+    cases = {'ambient': [],
+             'ConeCME': [dict(t_launch=0.5 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s),
+                              thickness=5 * u.solRad)]}
+    results = {}
+    for label, cme_args in cases.items():
+        v_grid = {}
+        for adaptive_dt in [False, True]:
+            model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale, adaptive_dt=adaptive_dt)
+            # Solve once before timing, so the solvers are compiled.
+            model.solve([H.ConeCME(**args) for args in cme_args])
+            solve_time = _time_per_call_(lambda: model.solve([H.ConeCME(**args) for args in cme_args]), 1, n_repeat)
+            mode = 'adaptive' if adaptive_dt else 'fixed'
+            results[label + ', ' + mode] = {'dt': model.dt.value, 'Nt': model.Nt, 'solve': solve_time}
+            v_grid[mode] = model.v_grid_cme.value
+
+        diff = np.abs(v_grid['adaptive'] - v_grid['fixed'])
+        results[label + ', adaptive']['mean diff'] = diff.mean()
+        results[label + ', adaptive']['max diff'] = diff.max()
+
+    return results
+
+
+def benchmark_semi_lagrangian(dt_scales=(4, 16, 32), simtime=5 * u.day, cr_num=2000, n_repeat=3):
+    """
+    Benchmark the accuracy and speed of the semi-Lagrangian scheme against the upwind scheme, for a run with a
+    ConeCME. The semi-Lagrangian scheme steps straight to each output time, so takes larger steps with larger dt_scale.
+    Its solutions are compared with the upwind solutions on the same output grid.
+    :param dt_scales: The output time step scalings to compare the schemes at.
+    :param simtime: Simulation time of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the semi-Lagrangian time step (s), solve time of each scheme (s), and the mean, 99th
+             percentile and maximum absolute difference (km/s) of the ambient and CME solutions from the upwind
+             solutions, for each dt_scale.
+    """
+    cme_args = dict(t_launch=0.5 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s),
+                    thickness=5 * u.solRad)
+    results = {}
+    for dt_scale in dt_scales:
+        models = {}
+        result = {}
+        for scheme in ['upwind', 'semi-lagrangian']:
+            model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale, scheme=scheme)
+            # Solve once before timing, so the solvers are compiled.
+            model.solve([H.ConeCME(**cme_args)])
+            result[scheme] = _time_per_call_(lambda: model.solve([H.ConeCME(**cme_args)]), 1, n_repeat)
+            models[scheme] = model
+
+        result['dt'] = models['semi-lagrangian'].dt.value
+        for field in ['v_grid_amb', 'v_grid_cme']:
+            diff = np.abs(getattr(models['semi-lagrangian'], field).value - getattr(models['upwind'], field).value)
+            result[field] = {'mean': diff.mean(), 'p99': np.percentile(diff, 99), 'max': diff.max()}
+
+        results[dt_scale] = result
+
+    return results
+
+
+def benchmark_longitude_resolution(nlons=(32, 64, 128, 256, 512), simtime=2 * u.day, dt_scale=4, cr_num=2000,
+                                   n_repeat=3):
+    """
+    Benchmark the throughput of solving HUXt at different longitudinal resolutions, for a run with a ConeCME.
+    :param nlons: The numbers of longitudes in the full longitude grid to benchmark.
+    :param simtime: Simulation time of the models.
+    :param dt_scale: Output time step scaling of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the solve time (s), longitudes solved per second, and output memory (bytes), for each
+             resolution.
+    """
+    cme_args = dict(t_launch=0.5 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s),
+                    thickness=5 * u.solRad)
+    results = {}
+    for nlon in nlons:
+        model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale, nlon_full=nlon)
+        # Solve once before timing, so the solvers are compiled.
+        model.solve([H.ConeCME(**cme_args)])
+        solve_time = _time_per_call_(lambda: model.solve([H.ConeCME(**cme_args)]), 1, n_repeat)
+        output = model.v_grid_cme.nbytes + model.v_grid_amb.nbytes
+        results[nlon] = {'solve': solve_time, 'lon per s': nlon / solve_time, 'output': output}
+
+    return results
+
+
+def benchmark_radial_grid(simtime=3 * u.day, cr_num=2000, n_repeat=3):
+    """
+    Benchmark solving HUXt on coarser and stretched radial grids, against the default uniform grid with dr=1.5 solar
+    radii, for a run with a ConeCME. The dt_scale of each case is set so all have the same output times, and the
+    solutions are interpolated onto the default radial grid for comparison.
+    :param simtime: Simulation time of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the number of radial grid points, solve time (s), and the mean and 99th percentile absolute
+             difference (km/s) from the default grid solution, for each radial grid.
+    """
+    cme_args = dict(t_launch=0.5 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s),
+                    thickness=5 * u.solRad)
+    cases = {'uniform, dr=1.5': dict(dt_scale=4),
+             'uniform, dr=3.0': dict(dr=3.0 * u.solRad, dt_scale=2),
+             'stretch 1.01': dict(dr_stretch=1.01, dt_scale=4),
+             'stretch 1.02': dict(dr_stretch=1.02, dt_scale=4)}
+    results = {}
+    reference = None
+    for label, model_args in cases.items():
+        model = H.HUXt(cr_num=cr_num, simtime=simtime, **model_args)
+        # Solve once before timing, so the solvers are compiled.
+        model.solve([H.ConeCME(**cme_args)])
+        solve_time = _time_per_call_(lambda: model.solve([H.ConeCME(**cme_args)]), 1, n_repeat)
+        if reference is None:
+            reference = model
+
+        r, v = model.interpolate_radial(reference.r)
+        diff = np.abs(v.value - reference.v_grid_cme.value)
+        results[label] = {'nr': model.nr, 'solve': solve_time, 'mean diff': diff.mean(),
+                          'p99 diff': np.percentile(diff, 99)}
+
+    return results
+
+
+def benchmark_output_window(simtime=5 * u.day, dt_scale=4, cr_num=2000, n_repeat=3):
+    """
+    Benchmark solving HUXt for only the last day of the simulation, at an hourly cadence, against the full output at
+    the default cadence. The frames of the window are compared with the full output interpolated to the same times.
+    :param simtime: Simulation time of the models.
+    :param dt_scale: Output time step scale of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the number of outputs, solve time (s) and output memory (bytes) of each case, and the
+             maximum absolute difference (km/s) of the window from the interpolated full output.
+    """
+    cme_args = dict(t_launch=3.5 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s))
+    window = dict(t_start=simtime - 1 * u.day, dt_out=1 * u.hour)
+    model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale)
+    # Solve once before timing, so the solvers are compiled.
+    model.solve([H.ConeCME(**cme_args)])
+    results = {}
+    for label, solve_args in {'full': {}, 'last day, hourly': window}.items():
+        solve_time = _time_per_call_(lambda: model.solve([H.ConeCME(**cme_args)], **solve_args), 1, n_repeat)
+        results[label] = {'nt_out': model.nt_out, 'solve': solve_time,
+                          'output': model.v_grid_cme.nbytes + model.v_grid_amb.nbytes}
+        if label == 'full':
+            time_full = model.time_out.value
+            v_full = model.v_grid_cme.value
+
+    # Interpolate the full output to the window times.
+    id_hi = np.clip(np.searchsorted(time_full, model.time_out.value), 1, time_full.size - 1)
+    weight = (model.time_out.value - time_full[id_hi - 1]) / (time_full[id_hi] - time_full[id_hi - 1])
+    weight = weight[:, np.newaxis, np.newaxis]
+    v_interp = (1 - weight) * v_full[id_hi - 1] + weight * v_full[id_hi]
+    results['max diff'] = np.abs(model.v_grid_cme.value - v_interp).max()
+    return results
+
+
+def benchmark_spin_up(simtimes=(1 * u.day, 2 * u.day, 5 * u.day), dt_scale=4, cr_num=2000, n_repeat=3):
+    """
+    Benchmark solving HUXt runs that reuse the cached spin up state, against integrating the spin up for every run, as
+    for the members of a CME ensemble. The spin up is a larger share of the model steps for short simulations.
+    :param simtimes: Simulation times of the models.
+    :param dt_scale: Output time step scale of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the solve time (s) with and without the cached spin up, and the maximum absolute difference
+             (km/s) between them, for each simulation time.
+    """
+    cme_args = dict(t_launch=0.2 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s))
+    results = {}
+    for simtime in simtimes:
+        model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale)
+        # Solve once before timing, so the solvers are compiled and the spin up is cached.
+        model.solve([H.ConeCME(**cme_args)])
+        result = {}
+        for reuse in [False, True]:
+            result['reuse' if reuse else 'integrate'] = _time_per_call_(
+                lambda: model.solve([H.ConeCME(**cme_args)], reuse_spin_up=reuse), 1, n_repeat)
+            v_cme = model.v_grid_cme.value.copy()
+            if reuse:
+                result['max diff'] = np.abs(v_cme - v_integrate).max()
+            else:
+                v_integrate = v_cme
+
+        results[simtime.to(u.day).value] = result
+
+    return results
+
+
+def benchmark_latitudes(nlats=(1, 2, 4, 8), simtime=2 * u.day, dt_scale=4, cr_num=2000, n_repeat=3):
+    """
+    Benchmark solving HUXt with increasing numbers of latitudes, for a run with an out of ecliptic ConeCME.
+    :param nlats: Numbers of latitudes to benchmark, which are spread evenly between -30 and 30 degrees.
+    :param simtime: Simulation time of the models.
+    :param dt_scale: Output time step scale of the models.
+    :param cr_num: Carrington rotation number of the boundary condition.
+    :param n_repeat: Number of timing repeats. The fastest is returned.
+    :return: Dictionary of the solve time (s) and the solve time per latitude (s), for each number of latitudes.
+    """
+    cme_args = dict(t_launch=0.5 * u.day, longitude=10 * u.deg, latitude=15 * u.deg, width=40 * u.deg,
+                    v=1000 * (u.km / u.s))
+    results = {}
+    for nlat in nlats:
+        lat = np.linspace(-30, 30, nlat) * u.deg if nlat > 1 else 0 * u.deg
+        model = H.HUXt(cr_num=cr_num, simtime=simtime, dt_scale=dt_scale, lat=lat)
+        # Solve once before timing, so the solvers are compiled.
+        model.solve([H.ConeCME(**cme_args)])
+        solve_time = _time_per_call_(lambda: model.solve([H.ConeCME(**cme_args)]), 1, n_repeat)
+        results[nlat] = {'solve': solve_time, 'per lat': solve_time / nlat}
+
+    return results
+
+
+# Script timing the import of HUXt in a fresh process, for benchmark_import.
+_IMPORT_SCRIPT_ = """
+import sys
+import time
+import json
+sys.path.insert(0, {path!r})
+t_start = time.perf_counter()
+import HUXt
+{extra}
+t_import = time.perf_counter()
+try:
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+except ImportError:
+    max_rss = float('nan')
+modules = [m for m in ['matplotlib', 'skimage', 'sunpy', 'imageio'] if m in sys.modules]
+print(json.dumps({{'import': t_import - t_start, 'max_rss': max_rss, 'modules': modules}}))
+"""
+
+
+def benchmark_import(n_repeat=3):
+    """
+    Benchmark the time and memory taken to import HUXt in a fresh process, as in a headless worker. This is compared
+    with also importing the plotting, animation, tracking and ephemeris libraries that HUXt loads on first use.
+    :param n_repeat: Number of fresh processes to time for each case. The fastest is returned.
+    :return: Dictionary of the import time (s), peak resident memory (MB, NaN where unavailable), and the optional
+             libraries that were imported, for each case.
+    """
+    path = os.path.dirname(os.path.abspath(H.__file__))
+    cases = {'headless': "",
+             'with plotting stack': "import matplotlib.pyplot, skimage.measure, scipy.ndimage, sunpy.coordinates.sun, "
+                                    "imageio"}
+    timings = {}
+    for label, extra in cases.items():
+        script = _IMPORT_SCRIPT_.format(path=path, extra=extra)
+        results = []
+        for i in range(n_repeat):
+            output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+            results.append(json.loads(output.stdout.splitlines()[-1]))
+
+        timings[label] = min(results, key=lambda result: result['import'])
+
+    return timings
+
+
+# Script timing the first solve in a fresh process, for benchmark_first_solve.
+_FIRST_SOLVE_SCRIPT_ = """
+import sys
+import time
+import json
+sys.path.insert(0, {path!r})
+t_start = time.perf_counter()
+import numpy as np
+import astropy.units as u
+import HUXt as H
+t_import = time.perf_counter()
+{warmup}
+t_warmup = time.perf_counter()
+model = H.HUXt(v_boundary=np.ones(128) * 400 * (u.km / u.s), simtime=1 * u.day, lon_out=0 * u.deg)
+model.solve([H.ConeCME(t_launch=0.1 * u.day)])
+t_solve = time.perf_counter()
+print(json.dumps({{'import': t_import - t_start, 'warmup': t_warmup - t_import, 'first solve': t_solve - t_warmup}}))
+"""
+
+
+def benchmark_first_solve():
+    """
+    Benchmark the latency of the first solve in a fresh process, as in a short lived batch worker. This is measured
+    with a cold numba cache, where the solvers must be compiled, and then a warm cache, where they are loaded from disk.
+    Each is measured with and without calling HUXt.warmup before the first solve. An empty numba cache directory is
+    used, so any existing cache is ignored.
+    :return: Dictionary of the import, warmup and first solve times for each case, in seconds.
+    """
+    path = os.path.dirname(os.path.abspath(H.__file__))
+    timings = {}
+    for warmup in [False, True]:
+        script = _FIRST_SOLVE_SCRIPT_.format(path=path, warmup="H.warmup()" if warmup else "")
+        # The first process compiles the solvers into the empty cache, and the second loads them.
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+            for cache in ['cold', 'warm']:
+                output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                                        check=True)
+                label = "{} cache, {}".format(cache, "warmup" if warmup else "no warmup")
+                timings[label] = json.loads(output.stdout.splitlines()[-1])
+
+    return timings
+
+
+def main():
+    """
+    Run all of the benchmarks and print the results.
+    """
+    print("Construction time per instance:")
+    for label, t in benchmark_construction().items():
+        print("    {:<24s}{:8.3f} ms".format(label, t * 1e3))
+
+    print("Boundary condition preprocessing time per call:")
+    for label, t in benchmark_boundary_preprocessing().items():
+        print("    {:<24s}{:8.3f} ms".format(label, t * 1e3))
+
+    print("Memory per model:")
+    for label, mem in benchmark_output_memory().items():
+        print("    {:<24s}construct {:8.3f} MB, solved output {:8.3f} MB".format(label, mem['construct'] / 1e6,
+                                                                              mem['output'] / 1e6))
+
+    print("Fixed and adaptive time step solves:")
+    for label, t in benchmark_adaptive_dt().items():
+        line = "    {:<24s}dt {:7.1f} s, {:5d} steps, solve {:7.3f} s".format(label, t['dt'], t['Nt'], t['solve'])
+        if 'mean diff' in t:
+            line += ", mean diff {:6.2f} km/s, max diff {:7.2f} km/s".format(t['mean diff'], t['max diff'])
+        print(line)
+
+    print("Semi-Lagrangian scheme compared with the upwind scheme:")
+    for dt_scale, t in benchmark_semi_lagrangian().items():
+        print("    dt_scale {:<15d}dt {:7.1f} s, solve {:7.3f} s, upwind solve {:7.3f} s".format(
+            dt_scale, t['dt'], t['semi-lagrangian'], t['upwind']))
+        for field in ['v_grid_amb', 'v_grid_cme']:
+            print("        {:<20s}mean diff {:6.2f} km/s, 99th percentile {:7.2f} km/s, max {:7.2f} km/s".format(
+                field, t[field]['mean'], t[field]['p99'], t[field]['max']))
+
+    print("Solve throughput by longitude resolution:")
+    for nlon, t in benchmark_longitude_resolution().items():
+        print("    nlon_full {:<14d}solve {:7.3f} s, {:8.1f} longitudes/s, output {:8.3f} MB".format(
+            nlon, t['solve'], t['lon per s'], t['output'] / 1e6))
+
+    print("Solves on coarser and stretched radial grids:")
+    for label, t in benchmark_radial_grid().items():
+        print("    {:<24s}nr {:4d}, solve {:7.3f} s, mean diff {:6.2f} km/s, 99th percentile {:7.2f} km/s".format(
+            label, t['nr'], t['solve'], t['mean diff'], t['p99 diff']))
+
+    print("Output window compared with the full output:")
+    window = benchmark_output_window()
+    for label in ['full', 'last day, hourly']:
+        t = window[label]
+        print("    {:<24s}nt_out {:4d}, solve {:7.3f} s, output {:8.3f} MB".format(label, t['nt_out'], t['solve'],
+                                                                                t['output'] / 1e6))
+    print("    {:<24s}{:7.3f} km/s".format('max diff', window['max diff']))
+
+    print("Solves reusing the cached spin up state:")
+    for simtime, t in benchmark_spin_up().items():
+        print("    simtime {:<5.1f} days{:7s}integrate {:7.3f} s, reuse {:7.3f} s, max diff {:6.2f} km/s".format(
+            simtime, "", t['integrate'], t['reuse'], t['max diff']))
+
+    print("Solve time by number of latitudes:")
+    for nlat, t in benchmark_latitudes().items():
+        print("    nlat {:<19d}solve {:7.3f} s, per latitude {:7.3f} s".format(nlat, t['solve'], t['per lat']))
+
+    print("Import in a fresh process:")
+    for label, t in benchmark_import().items():
+        print("    {:<24s}import {:7.3f} s, max RSS {:8.1f} MB, loaded {}".format(label, t['import'], t['max_rss'],
+                                                                               t['modules']))
+
+    print("First solve in a fresh process:")
+    for label, t in benchmark_first_solve().items():
+        print("    {:<24s}import {:7.3f} s, warmup {:7.3f} s, first solve {:7.3f} s".format(label, t['import'],
+                                                                                          t['warmup'],
+                                                                                          t['first solve']))
+    return
+
+
+if __name__ == "__main__":
+    main()
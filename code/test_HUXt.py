@@ -0,0 +1,491 @@
+import os
+import shutil
+
+import h5py
+import numpy as np
+import astropy.units as u
+from astropy.time import Time
+import pytest
+
+import HUXt as H
+
+BOUNDARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'boundary_conditions')
+
+
+@pytest.fixture(scope='module')
+def v_boundary():
+    """
+    The boundary condition of CR2000, read directly from the repository data, rather than the config.dat directories.
+    """
+    with h5py.File(os.path.join(BOUNDARY_DIR, 'CR2000.hdf5'), 'r') as data:
+        return data['v_boundary'][()] * u.Unit(data['v_boundary'].attrs['unit'])
+
+
+def _cone_cme_(**kwargs):
+    """
+    A fast ConeCME launched after the spin up, with any of its parameters overridden by kwargs.
+    """
+    cme_args = dict(t_launch=0.5 * u.day, longitude=10 * u.deg, width=30 * u.deg, v=1000 * (u.km / u.s),
+                    thickness=5 * u.solRad)
+    cme_args.update(kwargs)
+    return H.ConeCME(**cme_args)
+
+
+def test_cme_arrival(v_boundary):
+    """
+    CME arrival at a target must be the first output time that the target is in the CME, and NaN for a target the CME
+    misses.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=5 * u.day, dt_scale=4)
+    cme = _cone_cme_()
+    model.solve([cme])
+    arrival = model.cme_arrival(215 * u.solRad, [10, 190] * u.deg)
+    for key in ['t_arrive', 'v_arrive', 'duration']:
+        assert arrival[key].shape == (1, 2)
+
+    id_r = np.argmin(np.abs(model.r - 215 * u.solRad))
+    id_lon = np.argmin(np.abs(model.lon - cme.longitude))
+    v_cme = model.v_grid_cme[:, id_r, id_lon].value
+    v_amb = model.v_grid_amb[:, id_r, id_lon].value
+    id_t = np.flatnonzero((v_cme - v_amb) >= 20)[0]
+    assert arrival['t_arrive'][0, 0] == model.time_out[id_t]
+    assert arrival['v_arrive'][0, 0].value == v_cme[id_t]
+    assert arrival['duration'][0, 0] > 0 * u.s
+    assert np.all(np.isnan(arrival['t_arrive'][0, 1]))
+    assert np.all(np.isnan(arrival['v_arrive'][0, 1]))
+
+
+def test_cme_arrival_merging(v_boundary):
+    """
+    CMEs that merge before reaching a target must arrive together, without shifting the arrival of later CMEs onto the
+    flow of earlier ones.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=7 * u.day, dt_scale=4)
+    cmes = [_cone_cme_(v=600 * (u.km / u.s)), _cone_cme_(t_launch=1.0 * u.day, v=1500 * (u.km / u.s)),
+            _cone_cme_(t_launch=3.5 * u.day)]
+    model.solve(cmes)
+
+    # The first two CMEs merge into one period of CME flow at the target, so there are two periods for three CMEs.
+    id_r = np.argmin(np.abs(model.r - 215 * u.solRad))
+    id_lon = np.argmin(np.abs(model.lon - 10 * u.deg))
+    cme_bool = (model.v_grid_cme[:, id_r, id_lon] - model.v_grid_amb[:, id_r, id_lon]).value >= 20
+    id_start = np.flatnonzero(cme_bool & ~np.concatenate(([False], cme_bool[:-1])))
+    assert id_start.size == 2
+
+    t_arrive = model.cme_arrival(215 * u.solRad, 10 * u.deg)['t_arrive'][:, 0]
+    assert t_arrive[0] == model.time_out[id_start[0]]
+    assert t_arrive[1] == model.time_out[id_start[0]]
+    assert t_arrive[2] == model.time_out[id_start[1]]
+
+    # Before the second CME catches the first, the CMEs arrive separately, in launch order.
+    t_arrive = model.cme_arrival(40 * u.solRad, 10 * u.deg)['t_arrive'][:, 0]
+    assert np.all(np.diff(t_arrive) > 0 * u.s)
+
+
+def test_envelope_tracking(v_boundary):
+    """
+    The CME envelope must be ordered back to front, and agree with the contour tracked CME boundary.
+    """
+    model_contour = H.HUXt(v_boundary=v_boundary, simtime=5 * u.day, dt_scale=4)
+    model_contour.solve([_cone_cme_()])
+    model_envelope = H.HUXt(v_boundary=v_boundary, simtime=5 * u.day, dt_scale=4)
+    model_envelope.solve([_cone_cme_()], track='envelope')
+    cme_contour = model_contour.cmes[0]
+    cme_envelope = model_envelope.cmes[0]
+
+    r_front = cme_envelope.envelope['r_front'].value
+    r_back = cme_envelope.envelope['r_back'].value
+    assert r_front.shape == (model_envelope.nt_out, model_envelope.nlon)
+    assert np.array_equal(np.isfinite(r_front), np.isfinite(r_back))
+    found = np.isfinite(r_front)
+    assert np.any(found)
+    assert np.all(r_back[found] <= r_front[found])
+    # The CME is launched after the first output.
+    assert not np.any(found[0, :])
+
+    n_compared = 0
+    for j in range(model_envelope.nt_out):
+        r_contour = cme_contour.coords[j]['r']
+        r_envelope = cme_envelope.coords[j]['r']
+        assert r_envelope.size == 0 or np.all(np.isfinite(r_envelope))
+        if (r_contour.size > 0) and (r_envelope.size > 0):
+            assert np.abs(r_envelope.max() - r_contour.max()) <= model_envelope.dr
+            n_compared += 1
+
+    assert n_compared > 0
+
+
+def test_envelope_tracking_coarse_output(v_boundary):
+    """
+    The CME envelope must not depend on the CME crossing the inner boundary at an output time. The CME takes about 4
+    hours to cross the boundary, so 6 hourly outputs must give the same envelope as hourly outputs at the same times.
+    """
+    envelopes = []
+    for dt_out in [1, 6] * u.hour:
+        model = H.HUXt(v_boundary=v_boundary, simtime=5 * u.day, dt_scale=4)
+        model.solve([_cone_cme_()], track='envelope', dt_out=dt_out)
+        envelopes.append(model.cmes[0].envelope)
+
+    fine, coarse = envelopes
+    assert np.any(np.isfinite(coarse['r_front']))
+    for key in ['r_front', 'r_back']:
+        assert np.array_equal(fine[key][::6], coarse[key], equal_nan=True)
+
+
+def test_save_and_lazy_load(v_boundary, tmp_path):
+    """
+    A saved run must restore the same model state, whether it is loaded into memory or lazily from the file.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4)
+    model.solve([_cone_cme_()])
+    model._data_dir_ = str(tmp_path)
+    filepath = model.save(tag='test', chunks='longitude')
+
+    loaded, cme_list = H.load_HUXt_run(filepath)
+    with H.load_HUXt_run(filepath, lazy=True)[0] as lazy:
+        assert isinstance(lazy.v_grid_cme, H.LazyQuantity)
+        assert lazy.v_grid_cme.shape == model.v_grid_cme.shape
+        assert np.array_equal(lazy.v_grid_cme[:, 10, 5].value, model.v_grid_cme[:, 10, 5].value)
+        assert np.array_equal(lazy.v_grid_amb[3].value, model.v_grid_amb[3].value)
+        for restored in [loaded, lazy]:
+            for attr in ['time_out', 'r', 'lon', 'v_boundary', 'dt', 'dt_out']:
+                assert np.array_equal(getattr(restored, attr), getattr(model, attr))
+            assert np.array_equal(restored.v_grid_cme.value, model.v_grid_cme.value)
+            assert np.array_equal(restored.v_grid_amb.value, model.v_grid_amb.value)
+
+    assert lazy._file_ is None
+    assert len(cme_list) == 1
+    assert cme_list[0].v == model.cmes[0].v
+    for j in range(model.nt_out):
+        assert np.array_equal(cme_list[0].coords[j]['r'], model.cmes[0].coords[j]['r'])
+
+
+def test_restore_attributes(v_boundary, tmp_path):
+    """
+    A restored run must have the same attributes as the model built by HUXt.__init__ and solved, with the same values,
+    so that _restore_HUXt_ stays in step with HUXt.__init__.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=1 * u.day, dt_scale=4, lat=[0.0, 0.2] * u.rad, dtype=np.float32,
+                   adaptive_dt=True)
+    model.solve([])
+    model._data_dir_ = str(tmp_path)
+    filepath = model.save(tag='test')
+
+    # The output fields and the file handle of lazily loaded runs are compared by test_save_and_lazy_load, and the data
+    # directory was changed to save the run.
+    skip = ['_v_grid_cme_', '_v_grid_amb_', '_file_', '_data_dir_']
+    for lazy in [False, True]:
+        with H.load_HUXt_run(filepath, lazy=lazy)[0] as restored:
+            assert set(vars(restored)) == set(vars(model))
+            for attr, value in vars(model).items():
+                if attr not in skip:
+                    restored_value = vars(restored)[attr]
+                    if isinstance(value, Time):
+                        assert np.all(restored_value == value)
+                    elif isinstance(value, (np.ndarray, float)):
+                        assert np.array_equal(restored_value, value, equal_nan=True), attr
+                    else:
+                        assert restored_value == value, attr
+
+
+def test_observer_positions(tmp_path, monkeypatch):
+    """
+    Looking up several bodies at once must give the same positions as Observer, with unknown bodies defaulting to
+    Earth as they do for Observer, and NaN positions at times outside of the ephemeris.
+    """
+    ephemeris_file = str(tmp_path / 'ephemeris.hdf5')
+    jd = 2450000.0 + np.arange(0, 10, 1 / 12)
+    with h5py.File(ephemeris_file, 'w') as ephem:
+        for i, body in enumerate(['EARTH', 'VENUS', 'MERCURY', 'STA', 'STB']):
+            for frame in ['HEEQ', 'CARR']:
+                group = ephem.create_group(body + '/' + frame)
+                group['time'] = jd
+                group['radius'] = 1.5e8 - 1e7 * i + 1e6 * np.sin(jd)
+                group['longitude'] = (40 * i + 13 * (jd - jd[0])) % 360
+                group['latitude'] = 7 * np.sin(jd / 27)
+    monkeypatch.setattr(H, '_setup_dirs_', lambda: {'ephemeris': ephemeris_file})
+
+    times = Time(jd[0] + np.array([0.3, 4.71, 20.0]), format='jd')
+    positions = H.observer_positions(['venus', 'Pluto'], times)
+    assert positions['bodies'] == ['VENUS', 'EARTH']
+    for b, body in enumerate(['venus', 'Pluto']):
+        obs = H.Observer(body, times)
+        for f, frame in enumerate(['', '_c']):
+            for coord in ['r', 'lon', 'lat']:
+                assert np.array_equal(positions[coord][b, f].value, getattr(obs, coord + frame).value,
+                                      equal_nan=True)
+
+    assert np.all(np.isfinite(positions['r'][:, :, :2]))
+    assert np.all(np.isnan(positions['r'][:, :, 2]))
+
+
+def test_boundary_archive(tmp_path):
+    """
+    The boundary condition archive must hold every CR*.hdf5 file in a directory, and give the same boundary conditions
+    as the individual files.
+    """
+    cr_nums = [2000, 2001, 2002]
+    for cr_num in cr_nums:
+        shutil.copy(os.path.join(BOUNDARY_DIR, "CR{}.hdf5".format(cr_num)), str(tmp_path))
+
+    archive_file = H.pack_boundary_conditions(str(tmp_path))
+    assert os.path.isfile(archive_file)
+    cr_num_archive, v_archive = H.load_boundary_archive(str(tmp_path))
+    assert np.array_equal(cr_num_archive, cr_nums)
+    assert v_archive.unit == u.km / u.s
+    for i, cr_num in enumerate(cr_nums):
+        v_file = H.load_boundary(cr_num, boundary_dir=BOUNDARY_DIR)
+        assert np.allclose(v_archive[i], v_file)
+        assert np.allclose(H.load_boundary(cr_num, boundary_dir=str(tmp_path)), v_file)
+
+    assert H.load_boundary(1999, boundary_dir=str(tmp_path)) is None
+    empty_dir = tmp_path / 'empty'
+    empty_dir.mkdir()
+    assert H.load_boundary_archive(str(empty_dir)) == (None, None)
+
+
+@pytest.mark.parametrize('dt_scale, mean_max, p99_max', [(4, 7.0, 150.0), (16, 14.0, 230.0), (32, 28.0, 360.0)])
+def test_semi_lagrangian_accuracy(v_boundary, dt_scale, mean_max, p99_max):
+    """
+    The semi-Lagrangian solutions must stay within bounds of the mean and 99th percentile absolute difference from the
+    upwind solutions, on the same output grid. The differences are concentrated at stream interfaces and the CME
+    front, which the semi-Lagrangian scheme places to within about one output time step. The speed jumps there are
+    several hundred km/s, so the 99th percentile is a large fraction of a jump, and grows with the output time step.
+    The bounds are about 15% above the differences for CR2000, so that any loss of accuracy fails the test.
+    """
+    models = {}
+    for scheme in ['upwind', 'semi-lagrangian']:
+        models[scheme] = H.HUXt(v_boundary=v_boundary, simtime=5 * u.day, dt_scale=dt_scale, scheme=scheme)
+        models[scheme].solve([_cone_cme_()])
+
+    assert np.allclose(models['semi-lagrangian'].time_out.value, models['upwind'].time_out.value)
+    for field in ['v_grid_amb', 'v_grid_cme']:
+        v_sl = getattr(models['semi-lagrangian'], field).value
+        v_upwind = getattr(models['upwind'], field).value
+        assert np.all(np.isfinite(v_sl))
+        diff = np.abs(v_sl - v_upwind)
+        assert diff.mean() < mean_max
+        assert np.percentile(diff, 99) < p99_max
+
+
+def test_resample_boundary(v_boundary):
+    """
+    Resampling must keep a uniform boundary uniform, average over longitude bins when coarsening, and keep the
+    boundary unchanged at the same resolution.
+    """
+    v_uniform = H.resample_boundary(np.full(128, 400.0) * u.km / u.s, 48)
+    assert v_uniform.unit == u.km / u.s
+    assert np.allclose(v_uniform.value, 400.0)
+
+    v_coarse = H.resample_boundary(v_boundary, 64)
+    assert v_coarse.shape == (64,)
+    assert np.allclose(v_coarse.value, v_boundary.value.reshape((64, 2)).mean(axis=1))
+    assert np.isclose(v_coarse.value.mean(), v_boundary.value.mean())
+    assert np.allclose(H.resample_boundary(v_boundary, 128), v_boundary)
+
+    v_fine = H.resample_boundary(v_boundary, 512)
+    assert v_fine.shape == (512,)
+    assert v_fine.min() >= v_boundary.min()
+    assert v_fine.max() <= v_boundary.max()
+
+
+def test_stretched_grid_solution(v_boundary):
+    """
+    A solution on a stretched radial grid must be close to the uniform grid solution, once interpolated onto it.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4)
+    model.solve([])
+    model_stretched = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4, dr_stretch=1.01)
+    model_stretched.solve([])
+    assert model_stretched.nr < model.nr
+
+    r_out, v = model_stretched.interpolate_radial(model.r, field='ambient')
+    assert v.shape == model.v_grid_amb.shape
+    diff = np.abs(v - model.v_grid_amb).value
+    assert np.all(np.isfinite(v.value))
+    assert diff.mean() < 10.0
+
+
+def test_latitude_slice(v_boundary):
+    """
+    Solving at several latitudes must give the same solution at each latitude as a model of that latitude alone.
+    """
+    lats = [0.0, 0.2] * u.rad
+    model = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4, lat=lats)
+    model.solve([_cone_cme_(latitude=0.1 * u.rad)])
+    assert model.v_grid_cme.shape == (model.nt_out, model.nr, model.nlon, 2)
+
+    for id_lat, lat in enumerate(lats):
+        model_lat = model.latitude_slice(lat)
+        assert model_lat.nlat == 1
+        assert model_lat.lat == lat
+        assert np.array_equal(model_lat.v_grid_cme, model.v_grid_cme[..., id_lat])
+
+        model_single = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4, lat=lat)
+        model_single.solve([_cone_cme_(latitude=0.1 * u.rad)])
+        assert np.allclose(model_lat.v_grid_cme.value, model_single.v_grid_cme.value, rtol=0, atol=1e-9)
+        assert np.allclose(model_lat.v_grid_amb.value, model_single.v_grid_amb.value, rtol=0, atol=1e-9)
+        assert model_single.latitude_slice(0.5 * u.rad) is model_single
+
+    assert model.latitude_slice(0.15 * u.rad).lat == lats[1]
+
+
+def test_spin_up_reuse(v_boundary):
+    """
+    Reusing the cached spin up state must give the same solution as integrating the spin up again.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4)
+    model.solve([_cone_cme_()], reuse_spin_up=False)
+    v_cme = model.v_grid_cme.value.copy()
+    v_amb = model.v_grid_amb.value.copy()
+
+    model.solve([_cone_cme_()])
+    hits = H._spin_up_state_.cache_info().hits
+    model.solve([_cone_cme_(v=1500 * (u.km / u.s))])
+    assert H._spin_up_state_.cache_info().hits == hits + 1
+
+    model.solve([_cone_cme_()])
+    assert np.allclose(model.v_grid_cme.value, v_cme, rtol=0, atol=1e-9)
+    assert np.allclose(model.v_grid_amb.value, v_amb, rtol=0, atol=1e-9)
+
+
+def test_boundary_cache(v_boundary):
+    """
+    Models built from the same boundary conditions must share the cached preprocessing, and get the same boundary
+    conditions as preprocessing them directly.
+    """
+    r_min = 20 * u.solRad
+    H.HUXt(v_boundary=v_boundary, simtime=1 * u.day, nlon_full=64, r_min=r_min, map_inwards=True)
+    hits = H._preprocess_boundary_.cache_info().hits
+    model = H.HUXt(v_boundary=v_boundary, simtime=1 * u.day, nlon_full=64, r_min=r_min, map_inwards=True)
+    assert H._preprocess_boundary_.cache_info().hits == hits + 1
+
+    v_resampled = H.resample_boundary(v_boundary, 64)
+    assert np.allclose(model._v_boundary_init_, v_resampled)
+    assert np.allclose(model.v_boundary, H.map_v_boundary_inwards(v_resampled, 30 * u.solRad, r_min))
+
+    # The 2D form maps several boundaries together, as for models with more than one latitude.
+    v_rows = np.vstack((v_resampled.value, v_resampled.value[::-1])) * (u.km / u.s)
+    v_mapped = H.map_v_boundary_inwards(v_rows, 30 * u.solRad, r_min)
+    assert np.allclose(v_mapped[1], H.map_v_boundary_inwards(v_rows[1], 30 * u.solRad, r_min))
+
+
+def test_adaptive_dt_slow_boundary():
+    """
+    The adaptive time step must resolve the initial condition as well as the boundary, else a boundary slower than
+    the initial condition makes the solution unstable.
+    """
+    model = H.HUXt(v_boundary=np.full(128, 250.0) * u.km / u.s, simtime=1 * u.day, adaptive_dt=True)
+    model.solve([])
+    v_fastest = H.huxt_constants()['v_init'] * (1.0 + model.alpha)
+    assert model.dt <= H.huxt_constants()['cfl'] * model.dr.to(u.km) / v_fastest
+    assert np.all(np.isfinite(model.v_grid_amb.value))
+    assert model.v_grid_amb.value.min() >= 250.0 - 1e-6
+    assert model.v_grid_amb.value.max() <= 400.0 * (1.0 + model.alpha.value)
+
+
+def test_output_window_matches_full_run():
+    """
+    A window at the default output cadence must give the same frames, at the same times, as the full run, for
+    integer and non-integer dt_scale.
+    """
+    v_boundary = np.linspace(300, 600, 128) * u.km / u.s
+    for dt_scale in [4, 2.5]:
+        model = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=dt_scale)
+        model.solve([])
+        time_out = model.time_out.copy()
+        v_full = model.v_grid_amb.value.copy()
+
+        k_start, k_stop = 5, 20
+        model.solve([], t_start=time_out[k_start], t_stop=time_out[k_stop])
+        assert np.allclose(model.time_out.value, time_out[k_start:k_stop + 1].value)
+        assert np.allclose(model.v_grid_amb.value, v_full[k_start:k_stop + 1], rtol=0, atol=1e-6)
+
+
+def test_stretched_radial_grid():
+    """
+    A stretched radial grid must end exactly at r_max, with geometric steps no shorter than dr.
+    """
+    for r_max in [100, 240, 400]:
+        for dr_stretch in [1.01, 1.05, 1.5]:
+            r, dr, rrel, nr = H.radial_grid(r_max=r_max * u.solRad, dr_stretch=dr_stretch)
+            steps = np.diff(r.value)
+            assert r[0].value == 30.0
+            assert r[-1].value == r_max
+            assert rrel[0].value == 0.0
+            assert np.allclose(steps[1:] / steps[:-1], dr_stretch)
+            assert steps[0] >= dr.value
+
+
+def test_lazy_quantity_indexing(tmp_path):
+    """
+    LazyQuantity must select the same data, with axes in the same order, as numpy indexing of the full array.
+    """
+    data = np.random.default_rng(1).random((6, 7, 8))
+    filepath = os.path.join(str(tmp_path), 'lazy.hdf5')
+    with h5py.File(filepath, 'w') as f:
+        f.create_dataset('data', data=data)
+
+    index = np.array([3, -1, 0])
+    mask = np.zeros(8, dtype=bool)
+    mask[[1, 5]] = True
+    keys = [(Ellipsis, [-1]), (0, slice(None), index), (index, slice(None), 0), (index, 0, index), (-1,),
+            (slice(1, 4), index), (0, Ellipsis, index), (slice(None), -2, mask), (index, slice(None), index), (2, 3, 4)]
+    with h5py.File(filepath, 'r') as f:
+        lazy = H.LazyQuantity(f['data'], 'km/s')
+        for key in keys:
+            selection = lazy[key]
+            assert selection.unit == u.km / u.s
+            assert selection.shape == data[key].shape
+            assert np.array_equal(selection.value, data[key])
+
+        with pytest.raises(IndexError):
+            lazy[..., [8]]
+
+
+def test_solve_in_storage_dtype(v_boundary):
+    """
+    The solvers write into the output storage, so float32 storage must give the float64 solution to float32 precision,
+    at every latitude.
+    """
+    solutions = {}
+    for dtype in [np.float64, np.float32]:
+        model = H.HUXt(v_boundary=v_boundary, simtime=2 * u.day, dt_scale=4, lat=[0.0, 0.2] * u.rad, dtype=dtype)
+        model.solve([_cone_cme_(latitude=0.1 * u.rad)])
+        assert model.v_grid_cme.dtype == dtype
+        assert model.v_grid_amb.dtype == dtype
+        solutions[dtype] = model
+
+    for field in ['v_grid_amb', 'v_grid_cme']:
+        v_64 = getattr(solutions[np.float64], field).value
+        v_32 = getattr(solutions[np.float32], field).value
+        assert np.allclose(v_32, v_64, rtol=1e-6, atol=0)
+
+
+def test_semi_lagrangian_fine_output(v_boundary):
+    """
+    With dt_scale below 1, the semi-Lagrangian scheme must step with the CFL time step, and interpolate the outputs
+    between steps, rather than take a zero time step.
+    """
+    models = {}
+    for scheme in ['upwind', 'semi-lagrangian']:
+        models[scheme] = H.HUXt(v_boundary=v_boundary, simtime=1 * u.day, dt_scale=0.5, scheme=scheme)
+        models[scheme].solve([])
+
+    model = models['semi-lagrangian']
+    assert model.dt == models['upwind'].dt
+    assert model.dt_out == 0.5 * model.dt
+    assert np.all(np.isfinite(model.v_grid_amb.value))
+    diff = np.abs(model.v_grid_amb.value - models['upwind'].v_grid_amb.value)
+    assert diff.mean() < 2.0
+
+
+def test_boundary_rotation(v_boundary):
+    """
+    The default cr_lon_init must leave the boundary condition unchanged, and other values rotate it in longitude.
+    """
+    model = H.HUXt(v_boundary=v_boundary, simtime=1 * u.day)
+    assert np.array_equal(model.v_boundary.value, v_boundary.value)
+
+    model = H.HUXt(v_boundary=v_boundary, simtime=1 * u.day, cr_lon_init=90 * u.deg)
+    assert np.allclose(model.v_boundary.value, np.roll(v_boundary.value, -32), rtol=0, atol=1e-9)